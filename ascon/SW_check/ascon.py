@@ -6,7 +6,16 @@ https://ascon.iaik.tugraz.at/
 """
 from __future__ import annotations
 
-from typing import Literal, TypeAlias, Iterable
+import functools
+import os
+import struct
+import sys
+from typing import Literal, TypeAlias, Iterable, Callable, Sequence
+
+try:
+    import numpy as np  # optional, only needed for batched permutations
+except ImportError:
+    np = None
 
 BytesLike: TypeAlias = bytes|bytearray|memoryview
 
@@ -31,8 +40,10 @@ AsconMacVariant: TypeAlias = Literal[
 
 AsconVariant: TypeAlias = AsconAeadVariant|AsconHashVariant|AsconCxofVariant|AsconMacVariant
 
-debug = False
-debugpermutation = False
+# trace state, maintained by trace_subscribe()/trace_unsubscribe():
+# without subscribers all functions run on their trace-free paths
+tracing = False         # some subscriber is attached (phase events)
+tracing_rounds = False  # some subscriber wants round events (per-layer states)
 
 # === Ascon hash/xof ===
 
@@ -45,13 +56,62 @@ def ascon_hash(message: BytesLike, variant: AsconHashVariant|AsconCxofVariant =
     customization: a bytes object of at most 256 bytes specifying the customization string (only for Ascon-CXOF128)
     returns a bytes object containing the hash tag
     """
+    assert variant in ("Ascon-Hash256", "Ascon-XOF128", "Ascon-CXOF128")
+    if variant == "Ascon-Hash256": assert hashlength == 32
+    rate = 8 # bytes
+
+    # Initialization + Customization
+    S = ascon_hash_initialize(variant, customization)
+
+    # Message Processing (Absorbing)
+    m_padding = to_bytes([0x01]) + zero_bytes(rate - (len(message) % rate) - 1)
+    m_padded = to_bytes(message) + to_bytes(m_padding)
+
+    # message blocks 0,...,n
+    for m_word in bytes_to_words(m_padded):
+        S[0] ^= m_word
+        ascon_permutation(S, 12)
+    if tracing: trace("process message", S)
+
+    # Finalization (Squeezing)
+    squeezer = AsconSqueezer(S, rate, 12)
+    H = squeezer.read(hashlength)
+    if tracing: squeezer.trace_finalization()
+    return H
+
+
+def ascon_xof_stream(message: BytesLike, variant: AsconHashVariant|AsconCxofVariant = "Ascon-XOF128", customization: BytesLike = b"") -> AsconSqueezer:
+    """
+    Ascon-XOF128/Ascon-CXOF128 with lazily generated output of arbitrary length.
+    message: a bytes object of arbitrary length
+    variant: "Ascon-XOF128" or "Ascon-CXOF128"
+    customization: a bytes object of at most 256 bytes (only for Ascon-CXOF128)
+    returns an AsconSqueezer; read(n) or readinto(buffer) yields the next output bytes
+    """
+    assert variant in ("Ascon-XOF128", "Ascon-CXOF128")
+    return AsconHash(variant, message, customization).squeeze()
+
+
+def ascon_hash_initialize(variant: AsconHashVariant|AsconCxofVariant, customization: BytesLike = b"") -> list[int]:
+    """
+    Ascon hash initialization and customization phase - internal helper function.
+    variant: "Ascon-Hash256", "Ascon-XOF128", or "Ascon-CXOF128"
+    customization: a bytes object of at most 256 bytes (only for Ascon-CXOF128)
+    returns the Ascon state (a list of 5 64-bit integers) ready to absorb the message
+    """
     versions = {"Ascon-Hash256": 2,
                 "Ascon-XOF128": 3,
                 "Ascon-CXOF128": 4}
     assert variant in versions.keys()
-    if variant == "Ascon-Hash256": assert hashlength == 32
     if variant == "Ascon-CXOF128": assert len(customization) <= 256
     else: assert len(customization) == 0
+
+    # precomputed states (the full computation below is only needed for tracing
+    # and for the reference backend)
+    if not tracing and backend.precomputed:
+        if variant == "Ascon-CXOF128": return list(ascon_cxof_customized_state(to_bytes(customization)))
+        return list(HASH_INITIALIZED_STATES[variant])
+
     a = b = 12 # rounds
     rate = 8 # bytes
     taglen = 256 if variant == "Ascon-Hash256" else 0
@@ -60,10 +120,10 @@ def ascon_hash(message: BytesLike, variant: AsconHashVariant|AsconCxofVariant =
     # Initialization
     iv = to_bytes([versions[variant], 0, (b<<4) + a]) + int_to_bytes(taglen, 2) + to_bytes([rate, 0, 0])
     S = bytes_to_state(iv + zero_bytes(32))
-    if debug: printstate(S, "initial value:")
+    if tracing: trace("initial value", S)
 
     ascon_permutation(S, 12)
-    if debug: printstate(S, "initialization:")
+    if tracing: trace("initialization", S)
 
     # Customization
     if customize:
@@ -72,28 +132,116 @@ def ascon_hash(message: BytesLike, variant: AsconHashVariant|AsconCxofVariant =
         z_padded = z_length + customization + z_padding
 
         # customization blocks 0,...,m
-        for block in range(0, len(z_padded), rate):
-            S[0] ^= bytes_to_int(z_padded[block:block+rate])
+        for z_word in bytes_to_words(z_padded):
+            S[0] ^= z_word
             ascon_permutation(S, 12)
-        if debug: printstate(S, "customization:")
+        if tracing: trace("customization", S)
+    return S
 
-    # Message Processing (Absorbing)
-    m_padding = to_bytes([0x01]) + zero_bytes(rate - (len(message) % rate) - 1)
-    m_padded = to_bytes(message) + to_bytes(m_padding)
 
-    # message blocks 0,...,n
-    for block in range(0, len(m_padded), rate):
-        S[0] ^= bytes_to_int(m_padded[block:block+rate])
+# states after the initialization permutation, i.e., p^12(IV || 0^256)
+HASH_INITIALIZED_STATES = {
+    "Ascon-Hash256": (0x9b1e5494e934d681, 0x4bc3a01e333751d2, 0xae65396c6b34b81a, 0x3c7fd4a4d56a4db3, 0x1a5c464906c5976d),
+    "Ascon-XOF128":  (0xda82ce768d9447eb, 0xcc7ce6c75f1ef969, 0xe7508fd780085631, 0x0ee0ea53416b58cc, 0xe0547524db6f0bde),
+    "Ascon-CXOF128": (0x675527c2a0e8de03, 0x43d12d7dc0377bbc, 0xe9901dec426e81b5, 0x2ab14907720780b6, 0x8f3f1d02d432bc46),
+}
+
+@functools.lru_cache(maxsize=256)
+def ascon_cxof_customized_state(customization: bytes) -> tuple[int, ...]:
+    """
+    Ascon-CXOF128 state after absorbing the customization string - internal helper function.
+    customization: a bytes object of at most 256 bytes (hashable, used as cache key)
+    returns the Ascon state as a tuple of 5 64-bit integers (cached for the most recent strings)
+    """
+    rate = 8 # bytes
+    S = list(HASH_INITIALIZED_STATES["Ascon-CXOF128"])
+    z_padding = to_bytes([0x01]) + zero_bytes(rate - (len(customization) % rate) - 1)
+    z_length = int_to_bytes(len(customization)*8, 8)
+    z_padded = z_length + customization + z_padding
+    for z_word in bytes_to_words(z_padded):
+        S[0] ^= z_word
         ascon_permutation(S, 12)
-    if debug: printstate(S, "process message:")
+    return tuple(S)
 
-    # Finalization (Squeezing)
-    H = b""
-    while len(H) < hashlength:
-        H += int_to_bytes(S[0], rate)
+
+class AsconHash:
+    """
+    Incremental Ascon hash function and extendable-output function with a hashlib-like interface.
+    variant: "Ascon-Hash256", "Ascon-XOF128", or "Ascon-CXOF128" (see ascon_hash)
+    data: an optional first chunk of the message
+    customization: a bytes object of at most 256 bytes (only for Ascon-CXOF128)
+    Only the 5-word sponge state and at most one partial 8-byte block are kept,
+    so copy() is cheap and can be used to fork a common message prefix.
+    """
+    block_size = 8  # bytes (rate)
+
+    def __init__(self, variant: AsconHashVariant|AsconCxofVariant = "Ascon-Hash256", data: BytesLike = b"", customization: BytesLike = b"") -> None:
+        self.name = variant
+        self.digest_size = 32 if variant == "Ascon-Hash256" else 0  # 0: arbitrary output length (like hashlib.shake_128)
+        self.S = ascon_hash_initialize(variant, customization)
+        self.buffer = bytearray()
+        if data: self.update(data)
+
+    def update(self, data: BytesLike) -> None:
+        """
+        Absorb the next chunk of the message.
+        """
+        S = self.S
+        data = memoryview(data).cast("B")
+        rate = self.block_size
+        pos = 0
+        if self.buffer:
+            pos = min(rate - len(self.buffer), len(data))
+            self.buffer += data[:pos]
+            if len(self.buffer) < rate: return
+            S[0] ^= bytes_to_int(self.buffer)
+            ascon_permutation(S, 12)
+            self.buffer.clear()
+        end = pos + (len(data) - pos) // rate * rate
+        for m_word in bytes_to_words(data[pos:end]):
+            S[0] ^= m_word
+            ascon_permutation(S, 12)
+        self.buffer += data[end:]
+
+    def squeeze(self) -> AsconSqueezer:
+        """
+        Finalize a copy of the state, the object itself can be updated further.
+        returns an AsconSqueezer yielding the (arbitrarily long) output lazily
+        """
+        rate = self.block_size
+        S = list(self.S)
+
+        # last (padded) message block
+        m_padded = self.buffer + to_bytes([0x01]) + zero_bytes(rate - len(self.buffer) - 1)
+        S[0] ^= bytes_to_int(m_padded)
         ascon_permutation(S, 12)
-    if debug: printstate(S, "finalization:")
-    return H[:hashlength]
+        if tracing: trace("process message", S)
+        return AsconSqueezer(S, rate, 12)
+
+    def digest(self, hashlength: int = 32) -> bytes:
+        """
+        hashlength: the requested output bytelength (must be 32 for "Ascon-Hash256")
+        returns a bytes object containing the hash tag of the message absorbed so far
+        """
+        if self.name == "Ascon-Hash256": assert hashlength == 32
+        squeezer = self.squeeze()
+        H = squeezer.read(hashlength)
+        if tracing: squeezer.trace_finalization()
+        return H
+
+    def hexdigest(self, hashlength: int = 32) -> str:
+        return bytes_to_hex(self.digest(hashlength))
+
+    def copy(self) -> AsconHash:
+        """
+        returns an independent AsconHash object with the same absorbed message
+        """
+        other = object.__new__(AsconHash)
+        other.name = self.name
+        other.digest_size = self.digest_size
+        other.S = list(self.S)
+        other.buffer = bytearray(self.buffer)
+        return other
 
 
 # === Ascon MAC/PRF ===
@@ -121,55 +269,293 @@ def ascon_mac(key: BytesLike, message: BytesLike, variant: AsconMacVariant = "As
         # Initialization + Message Processing (Absorbing)
         IV = to_bytes([len(key) * 8, len(message)*8, a + 64, taglength * 8]) + zero_bytes(4)
         S = bytes_to_state(IV + key + message + zero_bytes(16 - len(message)))
-        if debug: printstate(S, "initial value:")
+        if tracing: trace("initial value", S)
 
         ascon_permutation(S, a)
-        if debug: printstate(S, "process message:")
+        if tracing: trace("process message", S)
 
         # Finalization (Squeezing)
         T = int_to_bytes(S[3] ^ bytes_to_int(key[0:8]), 8) + int_to_bytes(S[4] ^ bytes_to_int(key[8:16]), 8)
         return T[:taglength]
 
     else: # Ascon-Prf, Ascon-Mac
-        # Initialization
-        if variant == "Ascon-Mac": tagspec = int_to_bytes(16*8, 4)
-        elif variant == "Ascon-Prf": tagspec = int_to_bytes(0*8, 4)
-        else: assert False, f"unknown variant {variant!r}"
-        S = bytes_to_state(to_bytes([len(key) * 8, rate * 8, a + 128, a-b]) + tagspec + key + zero_bytes(16))
-        if debug: printstate(S, "initial value:")
-
-        ascon_permutation(S, a)
-        if debug: printstate(S, "initialization:")
-
-        # Message Processing (Absorbing)
-        m_padding = to_bytes([0x01]) + zero_bytes(msgblocksize - (len(message) % msgblocksize) - 1)
-        m_padded = to_bytes(message) + to_bytes(m_padding)
-
-        # first s-1 blocks
-        for block in range(0, len(m_padded) - msgblocksize, msgblocksize):
-            S[0] ^= bytes_to_int(m_padded[block:block+8])     # msgblocksize=32 bytes
-            S[1] ^= bytes_to_int(m_padded[block+8:block+16])
-            S[2] ^= bytes_to_int(m_padded[block+16:block+24])
-            S[3] ^= bytes_to_int(m_padded[block+24:block+32])
-            ascon_permutation(S, b)
-        # last block
-        block = len(m_padded) - msgblocksize
-        S[0] ^= bytes_to_int(m_padded[block:block+8])     # msgblocksize=32 bytes
-        S[1] ^= bytes_to_int(m_padded[block+8:block+16])
-        S[2] ^= bytes_to_int(m_padded[block+16:block+24])
-        S[3] ^= bytes_to_int(m_padded[block+24:block+32])
-        S[4] ^= 1
-        if debug: printstate(S, "process message:")
+        # Initialization + Message Processing (Absorbing)
+        S = ascon_mac_absorb(key, message, variant)
 
         # Finalization (Squeezing)
-        T = b""
-        ascon_permutation(S, a)
-        while len(T) < taglength:
-            T += int_to_bytes(S[0], 8)  # rate=16
-            T += int_to_bytes(S[1], 8)
-            ascon_permutation(S, b)
-        if debug: printstate(S, "finalization:")
-        return T[:taglength]
+        squeezer = AsconSqueezer(S, rate, b)
+        T = squeezer.read(taglength)
+        if tracing: squeezer.trace_finalization()
+        return T
+
+
+def ascon_mac_absorb(key: BytesLike, message: BytesLike, variant: AsconMacVariant = "Ascon-Mac") -> list[int]:
+    """
+    Ascon-Mac/Ascon-Prf initialization and message processing - internal helper function.
+    key: a bytes object of size 16
+    message: a bytes object of arbitrary length
+    variant: "Ascon-Mac" or "Ascon-Prf"
+    returns the Ascon state (a list of 5 64-bit integers) ready for squeezing
+    """
+    S = ascon_mac_initialize(key, variant)
+    ascon_mac_process_message(S, message)
+    return S
+
+
+def ascon_mac_initialize(key: BytesLike, variant: AsconMacVariant = "Ascon-Mac") -> list[int]:
+    """
+    Ascon-Mac/Ascon-Prf initialization phase - internal helper function.
+    key: a bytes object of size 16
+    variant: "Ascon-Mac" or "Ascon-Prf"
+    returns the initialized Ascon state (a list of 5 64-bit integers), depends on the key only
+    """
+    a = b = 12  # rounds
+    rate = 16 # bytes (output rate)
+
+    # Initialization
+    if variant == "Ascon-Mac": tagspec = int_to_bytes(16*8, 4)
+    elif variant == "Ascon-Prf": tagspec = int_to_bytes(0*8, 4)
+    else: assert False, f"unknown variant {variant!r}"
+    S = bytes_to_state(to_bytes([len(key) * 8, rate * 8, a + 128, a-b]) + tagspec + key + zero_bytes(16))
+    if tracing: trace("initial value", S)
+
+    ascon_permutation(S, a)
+    if tracing: trace("initialization", S)
+    return S
+
+
+def ascon_mac_process_message(S: list[int], message: BytesLike):
+    """
+    Ascon-Mac/Ascon-Prf message processing phase - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    message: a bytes object of arbitrary length
+    returns nothing, updates S (ready for squeezing)
+    """
+    a = b = 12  # rounds
+    msgblocksize = 32 # bytes (input rate for Mac, Prf)
+
+    # Message Processing (Absorbing)
+    m_padding = to_bytes([0x01]) + zero_bytes(msgblocksize - (len(message) % msgblocksize) - 1)
+    m_padded = to_bytes(message) + to_bytes(m_padding)
+
+    m_words = bytes_to_words(m_padded)
+
+    # first s-1 blocks
+    for w in range(0, len(m_words) - 4, 4):
+        S[0] ^= m_words[w]     # msgblocksize=32 bytes
+        S[1] ^= m_words[w+1]
+        S[2] ^= m_words[w+2]
+        S[3] ^= m_words[w+3]
+        ascon_permutation(S, b)
+    # last block
+    w = len(m_words) - 4
+    S[0] ^= m_words[w]     # msgblocksize=32 bytes
+    S[1] ^= m_words[w+1]
+    S[2] ^= m_words[w+2]
+    S[3] ^= m_words[w+3]
+    S[4] ^= 1
+    if tracing: trace("process message", S)
+
+    # Finalization (first permutation, squeezing follows)
+    ascon_permutation(S, a)
+
+
+def ascon_prf_stream(key: BytesLike, message: BytesLike) -> AsconSqueezer:
+    """
+    Ascon-Prf with lazily generated output of arbitrary length.
+    key: a bytes object of size 16
+    message: a bytes object of arbitrary length
+    returns an AsconSqueezer; read(n) or readinto(buffer) yields the next output bytes
+    """
+    assert len(key) == 16
+    return AsconSqueezer(ascon_mac_absorb(key, message, "Ascon-Prf"), 16, 12)
+
+
+class AsconMac:
+    """
+    Ascon MAC/PRF bound to one key.
+    key: a bytes object of size 16
+    variant: "Ascon-Mac", "Ascon-Prf", or "Ascon-PrfShort" (see ascon_mac)
+    The key words and, for Ascon-Mac/Ascon-Prf, the key-only initialized state are
+    computed once, so every further tag saves the initialization permutation.
+    """
+
+    def __init__(self, key: BytesLike, variant: AsconMacVariant = "Ascon-Mac") -> None:
+        assert variant in ("Ascon-Mac", "Ascon-Prf", "Ascon-PrfShort")
+        assert len(key) == 16
+        self.variant = variant
+        self.key = to_bytes(key)
+        self.k0, self.k1 = bytes_to_words(self.key)
+        self.S = tuple(ascon_mac_initialize(key, variant)) if variant != "Ascon-PrfShort" else None
+
+    def mac(self, message: BytesLike, taglength: int = 16) -> bytes:
+        """
+        message: a bytes object of arbitrary length (<= 16 for "Ascon-PrfShort")
+        taglength: the requested output bytelength (see ascon_mac)
+        returns a bytes object containing the authentication tag, equal to ascon_mac(key, message, variant, taglength)
+        """
+        a = b = 12  # rounds
+        rate = 16 # bytes (output rate)
+        if self.variant == "Ascon-Mac": assert taglength <= 16
+        if self.variant == "Ascon-PrfShort":
+            assert taglength <= 16 and len(message) <= 16
+            # Initialization + Message Processing (Absorbing)
+            m0, m1 = bytes_to_words(to_bytes(message) + zero_bytes(16 - len(message)))
+            iv = bytes_to_int(to_bytes([16 * 8, len(message)*8, a + 64, taglength * 8]))
+            S = [iv, self.k0, self.k1, m0, m1]
+            if tracing: trace("initial value", S)
+            ascon_permutation(S, a)
+            if tracing: trace("process message", S)
+            # Finalization (Squeezing)
+            return struct.pack("<QQ", S[3] ^ self.k0, S[4] ^ self.k1)[:taglength]
+
+        return self.stream(message).read(taglength)
+
+    def stream(self, message: BytesLike) -> AsconSqueezer:
+        """
+        message: a bytes object of arbitrary length
+        returns an AsconSqueezer yielding the tag (or Ascon-Prf output) lazily
+        """
+        assert self.S is not None, "no output stream for Ascon-PrfShort"
+        S = list(self.S)
+        ascon_mac_process_message(S, message)
+        return AsconSqueezer(S, 16, 12)
+
+
+class AsconMacStream:
+    """
+    Incremental Ascon-Mac/Ascon-Prf over a message given in chunks.
+    key: a bytes object of size 16
+    variant: "Ascon-Mac" or "Ascon-Prf"
+    data: an optional first chunk of the message
+    Only the 5-word sponge state and at most one partial 32-byte block are kept,
+    so copy() is cheap and digest() can be taken after every chunk.
+    """
+    block_size = 32  # bytes (input rate)
+
+    def __init__(self, key: BytesLike, variant: AsconMacVariant = "Ascon-Mac", data: BytesLike = b"") -> None:
+        assert variant in ("Ascon-Mac", "Ascon-Prf")
+        assert len(key) == 16
+        self.variant = variant
+        self.S = ascon_mac_initialize(key, variant)
+        self.buffer = bytearray()
+        if data: self.update(data)
+
+    def update(self, data: BytesLike) -> None:
+        """
+        Absorb the next chunk of the message.
+        """
+        S = self.S
+        data = memoryview(data).cast("B")
+        rate = self.block_size
+        self.buffer += data
+        end = len(self.buffer) // rate * rate
+        if end == 0: return
+        m_words = bytes_to_words(self.buffer[:end])
+        for w in range(0, len(m_words), 4):
+            S[0] ^= m_words[w]
+            S[1] ^= m_words[w+1]
+            S[2] ^= m_words[w+2]
+            S[3] ^= m_words[w+3]
+            ascon_permutation(S, 12)
+        del self.buffer[:end]
+
+    def squeeze(self) -> AsconSqueezer:
+        """
+        Finalize a copy of the state, the object itself can be updated further.
+        returns an AsconSqueezer yielding the tag (or Ascon-Prf output) lazily
+        """
+        S = list(self.S)
+        ascon_mac_process_message(S, self.buffer)  # last (padded) block only
+        return AsconSqueezer(S, 16, 12)
+
+    def digest(self, taglength: int = 16) -> bytes:
+        """
+        taglength: the requested output bytelength (must be <= 16 for "Ascon-Mac")
+        returns the tag of the message absorbed so far, equal to ascon_mac(key, message, variant, taglength)
+        """
+        if self.variant == "Ascon-Mac": assert taglength <= 16
+        return self.squeeze().read(taglength)
+
+    def copy(self) -> AsconMacStream:
+        """
+        returns an independent AsconMacStream object with the same absorbed message
+        """
+        other = object.__new__(AsconMacStream)
+        other.variant = self.variant
+        other.S = list(self.S)
+        other.buffer = bytearray(self.buffer)
+        return other
+
+
+# === Ascon squeezing (XOF/PRF output streams) ===
+
+class AsconSqueezer:
+    """
+    Lazy output stream of an Ascon sponge in the squeezing phase.
+    S: Ascon state ready to output its first block (updated in place)
+    rate: output block size in bytes (8 for Ascon-XOF128/CXOF128, 16 for Ascon-Prf)
+    rounds: number of permutation rounds between two output blocks
+    Output blocks are only computed when read, and are written straight into the
+    caller's buffer, so reading n bytes costs O(n) time and no extra allocations.
+    """
+
+    def __init__(self, S: list[int], rate: int = 8, rounds: int = 12) -> None:
+        assert rate in (8, 16)
+        self.S = S
+        self.rate = rate
+        self.rounds = rounds
+        self.block = bytearray(rate)  # last output block
+        self.used = rate              # bytes of self.block already returned
+        self.started = False
+
+    def next_block(self, out: memoryview, offset: int) -> None:
+        # write the next full output block to out[offset:offset+rate]
+        S = self.S
+        if self.started: ascon_permutation(S, self.rounds)
+        self.started = True
+        if self.rate == 8: struct.pack_into("<Q", out, offset, S[0])
+        else: struct.pack_into("<QQ", out, offset, S[0], S[1])
+
+    def trace_finalization(self) -> None:
+        # emit the "finalization" event (only called if tracing): the state after
+        # the permutation following the last output block, like the squeeze loop
+        # that permutes after every block; the stream itself stays unchanged
+        S = list(self.S)
+        if self.started: ascon_permutation(S, self.rounds)
+        trace("finalization", S)
+
+    def readinto(self, buffer: bytearray|memoryview) -> int:
+        """
+        Fill buffer with the next len(buffer) output bytes.
+        returns the number of bytes written (always len(buffer))
+        """
+        out = memoryview(buffer).cast("B")
+        n = len(out)
+        rate = self.rate
+        # rest of the previous block
+        pos = min(rate - self.used, n)
+        out[:pos] = self.block[self.used:self.used+pos]
+        self.used += pos
+        # full blocks directly into the caller's buffer
+        while n - pos >= rate:
+            self.next_block(out, pos)
+            pos += rate
+        # partial block: keep the rest for the next read
+        if pos < n:
+            self.next_block(self.block, 0)
+            self.used = n - pos
+            out[pos:] = self.block[:self.used]
+        return n
+
+    def read(self, n: int) -> bytes:
+        """
+        returns the next n output bytes
+        """
+        assert n >= 0
+        out = bytearray(n)
+        self.readinto(out)
+        return bytes(out)
 
 
 # === Ascon AEAD encryption and decryption ===
@@ -221,14 +607,388 @@ def ascon_decrypt(key: BytesLike, nonce: BytesLike, associateddata: BytesLike, c
 
     ascon_initialize(S, k, rate, a, b, versions[variant], key, nonce)
     ascon_process_associated_data(S, b, rate, associateddata)
-    plaintext = ascon_process_ciphertext(S, b, rate, ciphertext[:-16])
+    keystream = []
+    ascon_absorb_ciphertext(S, b, rate, ciphertext[:-16], keystream)
     tag = ascon_finalize(S, rate, a, key)
     if tag == ciphertext[-16:]:
-        return plaintext
+        return ascon_apply_keystream(keystream, ciphertext[:-16], rate)
+    else:
+        return None
+
+
+def ascon_verify(key: BytesLike, nonce: BytesLike, associateddata: BytesLike, ciphertext: BytesLike, variant: AsconAeadVariant = "Ascon-AEAD128") -> bool:
+    """
+    Ascon tag verification without decryption.
+    key: a bytes object of size 16 (for Ascon-AEAD128; 128-bit security)
+    nonce: a bytes object of size 16 (must not repeat for the same key!)
+    associateddata: a bytes object of arbitrary length
+    ciphertext: a bytes object of arbitrary length (also contains tag)
+    variant: "Ascon-AEAD128"
+    returns True if ascon_decrypt would return the plaintext, False if verification fails
+    The ciphertext words are absorbed into the state directly, so no plaintext is computed.
+    """
+    versions = {"Ascon-AEAD128": 1}
+    assert variant in versions.keys()
+    assert len(key) == 16 and len(nonce) == 16 and len(ciphertext) >= 16
+    S = [0, 0, 0, 0, 0]
+    k = len(key) * 8 # bits
+    a = 12  # rounds
+    b = 8   # rounds
+    rate = 16   # bytes
+
+    ascon_initialize(S, k, rate, a, b, versions[variant], key, nonce)
+    ascon_process_associated_data(S, b, rate, associateddata)
+    ascon_absorb_ciphertext(S, b, rate, ciphertext[:-16])
+    tag = ascon_finalize(S, rate, a, key)
+    return tag == ciphertext[-16:]
+
+
+def ascon_encrypt_into(key: BytesLike, nonce: BytesLike, associateddata: BytesLike, plaintext: BytesLike, out: bytearray|memoryview, variant: AsconAeadVariant = "Ascon-AEAD128") -> int:
+    """
+    Ascon encryption into a caller-provided buffer.
+    key: a bytes object of size 16 (for Ascon-AEAD128; 128-bit security)
+    nonce: a bytes object of size 16 (must not repeat for the same key!)
+    associateddata: a bytes object of arbitrary length
+    plaintext: a bytes-like object of arbitrary length (read in place, e.g. a memoryview of an mmap)
+    out: a writable bytes-like object of at least len(plaintext)+16 bytes (may be a slice of a larger buffer)
+    variant: "Ascon-AEAD128"
+    returns the number of bytes written to out (ciphertext followed by the tag)
+    Full blocks are read from plaintext and written to out directly; only the last partial block is copied.
+    """
+    versions = {"Ascon-AEAD128": 1}
+    assert variant in versions.keys()
+    assert len(key) == 16 and len(nonce) == 16
+    src = memoryview(plaintext).cast("B")
+    dst = memoryview(out).cast("B")
+    assert len(dst) >= len(src) + 16
+    S = [0, 0, 0, 0, 0]
+    k = len(key) * 8   # bits
+    a = 12   # rounds
+    b = 8    # rounds
+    rate = 16   # bytes
+
+    ascon_initialize(S, k, rate, a, b, versions[variant], key, nonce)
+    ascon_process_associated_data(S, b, rate, associateddata)
+
+    # first t-1 blocks (all complete blocks)
+    p_len = len(src)
+    p_full = p_len - p_len % rate
+    for block in range(0, p_full, rate):
+        p0, p1 = struct.unpack_from("<QQ", src, block)
+        S[0] ^= p0
+        S[1] ^= p1
+        struct.pack_into("<QQ", dst, block, S[0], S[1])
+        ascon_permutation(S, b)
+
+    # last block t (partial or padding only)
+    dst[p_full:p_len] = ascon_process_plaintext(S, b, rate, src[p_full:])
+    dst[p_len:p_len+16] = ascon_finalize(S, rate, a, key)
+    return p_len + 16
+
+
+def ascon_decrypt_into(key: BytesLike, nonce: BytesLike, associateddata: BytesLike, ciphertext: BytesLike, out: bytearray|memoryview, variant: AsconAeadVariant = "Ascon-AEAD128") -> int|None:
+    """
+    Ascon decryption into a caller-provided buffer.
+    key: a bytes object of size 16 (for Ascon-AEAD128; 128-bit security)
+    nonce: a bytes object of size 16 (must not repeat for the same key!)
+    associateddata: a bytes object of arbitrary length
+    ciphertext: a bytes-like object of arbitrary length (also contains tag, read in place)
+    out: a writable bytes-like object of at least len(ciphertext)-16 bytes
+    variant: "Ascon-AEAD128"
+    returns the number of plaintext bytes written to out, or None if verification fails (out is zeroed then)
+    """
+    versions = {"Ascon-AEAD128": 1}
+    assert variant in versions.keys()
+    assert len(key) == 16 and len(nonce) == 16 and len(ciphertext) >= 16
+    src = memoryview(ciphertext).cast("B")
+    dst = memoryview(out).cast("B")
+    c_len = len(src) - 16
+    assert len(dst) >= c_len
+    S = [0, 0, 0, 0, 0]
+    k = len(key) * 8 # bits
+    a = 12  # rounds
+    b = 8   # rounds
+    rate = 16   # bytes
+
+    ascon_initialize(S, k, rate, a, b, versions[variant], key, nonce)
+    ascon_process_associated_data(S, b, rate, associateddata)
+
+    # first t-1 blocks (all complete blocks)
+    c_full = c_len - c_len % rate
+    for block in range(0, c_full, rate):
+        c0, c1 = struct.unpack_from("<QQ", src, block)
+        struct.pack_into("<QQ", dst, block, S[0] ^ c0, S[1] ^ c1)
+        S[0] = c0
+        S[1] = c1
+        ascon_permutation(S, b)
+
+    # last block t (partial or padding only)
+    dst[c_full:c_len] = ascon_process_ciphertext(S, b, rate, src[c_full:c_len])
+    tag = ascon_finalize(S, rate, a, key)
+    if tag == src[c_len:]:
+        return c_len
     else:
+        dst[:c_len] = zero_bytes(c_len)
         return None
 
 
+class AsconAEAD:
+    """
+    Ascon AEAD bound to one key.
+    key: a bytes object of size 16 (for Ascon-AEAD128; 128-bit security)
+    variant: "Ascon-AEAD128"
+    The IV and key words are computed once instead of on every call, which
+    helps workloads that encrypt many messages under the same key.
+    """
+    rate = 16   # bytes
+    a = 12      # rounds
+    b = 8       # rounds
+
+    def __init__(self, key: BytesLike, variant: AsconAeadVariant = "Ascon-AEAD128") -> None:
+        versions = {"Ascon-AEAD128": 1}
+        assert variant in versions.keys()
+        assert len(key) == 16
+        taglen = 128
+        self.key = to_bytes(key)
+        self.k0, self.k1 = bytes_to_words(self.key)
+        self.iv = bytes_to_int(to_bytes([versions[variant], 0, (self.b<<4) + self.a]) + int_to_bytes(taglen, 2) + to_bytes([self.rate, 0, 0]))
+
+    def initialize(self, nonce: BytesLike) -> list[int]:
+        """
+        Ascon initialization phase with the cached key words.
+        nonce: a bytes object of size 16
+        returns the initialized Ascon state (a list of 5 64-bit integers)
+        """
+        assert len(nonce) == 16
+        n0, n1 = bytes_to_words(to_bytes(nonce))
+        S = [self.iv, self.k0, self.k1, n0, n1]
+        if tracing: trace("initial value", S)
+        ascon_permutation(S, self.a)
+        S[3] ^= self.k0
+        S[4] ^= self.k1
+        if tracing: trace("initialization", S)
+        return S
+
+    def finalize(self, S: list[int]) -> bytes:
+        """
+        Ascon finalization phase with the cached key words.
+        S: Ascon state, a list of 5 64-bit integers
+        returns the tag, updates S
+        """
+        S[2] ^= self.k0
+        S[3] ^= self.k1
+        ascon_permutation(S, self.a)
+        S[3] ^= self.k0
+        S[4] ^= self.k1
+        if tracing: trace("finalization", S)
+        return struct.pack("<QQ", S[3], S[4])
+
+    def encrypt(self, nonce: BytesLike, associateddata: BytesLike, plaintext: BytesLike) -> bytes:
+        """
+        Same as ascon_encrypt(key, nonce, associateddata, plaintext).
+        returns a bytes object of length len(plaintext)+16 containing the ciphertext and tag
+        """
+        S = self.initialize(nonce)
+        ascon_process_associated_data(S, self.b, self.rate, associateddata)
+        ciphertext = ascon_process_plaintext(S, self.b, self.rate, plaintext)
+        return ciphertext + self.finalize(S)
+
+    def decrypt(self, nonce: BytesLike, associateddata: BytesLike, ciphertext: BytesLike) -> bytes|None:
+        """
+        Same as ascon_decrypt(key, nonce, associateddata, ciphertext).
+        returns a bytes object containing the plaintext or None if verification fails
+        """
+        assert len(ciphertext) >= 16
+        S = self.initialize(nonce)
+        ascon_process_associated_data(S, self.b, self.rate, associateddata)
+        keystream = []
+        ascon_absorb_ciphertext(S, self.b, self.rate, ciphertext[:-16], keystream)
+        if self.finalize(S) == ciphertext[-16:]:
+            return ascon_apply_keystream(keystream, ciphertext[:-16], self.rate)
+        else:
+            return None
+
+    def verify(self, nonce: BytesLike, associateddata: BytesLike, ciphertext: BytesLike) -> bool:
+        """
+        Same as ascon_verify(key, nonce, associateddata, ciphertext).
+        returns True if the tag is valid
+        """
+        assert len(ciphertext) >= 16
+        S = self.initialize(nonce)
+        ascon_process_associated_data(S, self.b, self.rate, associateddata)
+        ascon_absorb_ciphertext(S, self.b, self.rate, ciphertext[:-16])
+        return self.finalize(S) == ciphertext[-16:]
+
+
+# === Ascon AEAD streaming encryption and decryption ===
+
+class AsconAEADStream:
+    """
+    Common base of AsconAEADEncryptor and AsconAEADDecryptor - internal helper class.
+    Full 16-byte blocks are processed as soon as they arrive; at most one
+    partial block is kept in the buffer, so memory use does not depend on the
+    message length.
+    """
+    rate = 16   # bytes
+    a = 12      # rounds
+    b = 8       # rounds
+
+    def __init__(self, key: BytesLike, nonce: BytesLike, variant: AsconAeadVariant = "Ascon-AEAD128") -> None:
+        versions = {"Ascon-AEAD128": 1}
+        assert variant in versions.keys()
+        assert len(key) == 16 and len(nonce) == 16
+        self.key = to_bytes(key)
+        self.S = [0, 0, 0, 0, 0]
+        self.buffer = bytearray()
+        self.adlen = 0
+        self.phase = "associated data"
+        ascon_initialize(self.S, len(key) * 8, self.rate, self.a, self.b, versions[variant], key, nonce)
+
+    def update_ad(self, associateddata: BytesLike) -> None:
+        """
+        Absorb the next chunk of associated data (only before the first update()).
+        """
+        assert self.phase == "associated data", "associated data must come before the message"
+        self.adlen += len(associateddata)
+        self._blocks(associateddata, self._absorb_ad_block)
+
+    def _absorb_ad_block(self, a0: int, a1: int, out: bytearray|None = None) -> None:
+        S = self.S
+        S[0] ^= a0
+        S[1] ^= a1
+        ascon_permutation(S, self.b)
+
+    def _start_message(self) -> None:
+        # last (padded) associated data block + domain separation
+        if self.phase != "associated data": return
+        if self.adlen > 0:
+            self.buffer += to_bytes([0x01]) + zero_bytes(self.rate - len(self.buffer) - 1)
+            self._absorb_ad_block(*struct.unpack("<QQ", self.buffer))
+        self.buffer.clear()
+        self.S[4] ^= 1<<63
+        if tracing: trace("process associated data", self.S)
+        self.phase = "message"
+
+    def _blocks(self, data: BytesLike, process_block: Callable[[int, int, bytearray|None], None], out: bytearray|None = None) -> None:
+        # feed data through the partial-block buffer, process every complete block
+        data = memoryview(data).cast("B")
+        rate = self.rate
+        pos = 0
+        if self.buffer:
+            pos = min(rate - len(self.buffer), len(data))
+            self.buffer += data[:pos]
+            if len(self.buffer) < rate: return
+            process_block(*struct.unpack("<QQ", self.buffer), out)
+            self.buffer.clear()
+        end = pos + (len(data) - pos) // rate * rate
+        words = bytes_to_words(data[pos:end])
+        for w in range(0, len(words), 2):
+            process_block(words[w], words[w+1], out)
+        self.buffer += data[end:]
+
+    def _finalize_tag(self) -> bytes:
+        self.phase = "finalized"
+        return ascon_finalize(self.S, self.rate, self.a, self.key)
+
+    def copy(self) -> AsconAEADStream:
+        """
+        returns an independent object of the same class with the same absorbed input
+        (e.g. to fork the state after a common associated data or message prefix)
+        """
+        other = object.__new__(type(self))
+        other.key = self.key
+        other.S = list(self.S)
+        other.buffer = bytearray(self.buffer)
+        other.adlen = self.adlen
+        other.phase = self.phase
+        return other
+
+
+class AsconAEADEncryptor(AsconAEADStream):
+    """
+    Incremental Ascon encryption.
+    key: a bytes object of size 16 (for Ascon-AEAD128; 128-bit security)
+    nonce: a bytes object of size 16 (must not repeat for the same key!)
+    Call update_ad() for the associated data, update() for the plaintext and
+    finalize() once at the end; the concatenation of all returned bytes equals
+    ascon_encrypt(key, nonce, associateddata, plaintext).
+    """
+
+    def update(self, plaintext: BytesLike) -> bytes:
+        """
+        Encrypt the next plaintext chunk.
+        returns the ciphertext of all blocks completed by this chunk
+        """
+        assert self.phase != "finalized", "cannot update after finalize"
+        self._start_message()
+        ciphertext = bytearray()
+        self._blocks(plaintext, self._encrypt_block, ciphertext)
+        return bytes(ciphertext)
+
+    def _encrypt_block(self, p0: int, p1: int, ciphertext: bytearray) -> None:
+        S = self.S
+        S[0] ^= p0
+        S[1] ^= p1
+        ciphertext += struct.pack("<QQ", S[0], S[1])
+        ascon_permutation(S, self.b)
+
+    def finalize(self) -> bytes:
+        """
+        Encrypt the buffered last block and compute the tag.
+        returns the remaining ciphertext followed by the 16-byte tag
+        """
+        assert self.phase != "finalized", "cannot finalize twice"
+        self._start_message()
+        ciphertext = ascon_process_plaintext(self.S, self.b, self.rate, self.buffer)
+        self.buffer.clear()
+        return ciphertext + self._finalize_tag()
+
+
+class AsconAEADDecryptor(AsconAEADStream):
+    """
+    Incremental Ascon decryption.
+    key: a bytes object of size 16 (for Ascon-AEAD128; 128-bit security)
+    nonce: a bytes object of size 16
+    Call update_ad() for the associated data, update() for the ciphertext
+    (without tag) and finalize(tag) once at the end.
+    Note: plaintext returned by update() is unverified until finalize() succeeds.
+    """
+
+    def update(self, ciphertext: BytesLike) -> bytes:
+        """
+        Decrypt the next ciphertext chunk (without tag).
+        returns the (unverified) plaintext of all blocks completed by this chunk
+        """
+        assert self.phase != "finalized", "cannot update after finalize"
+        self._start_message()
+        plaintext = bytearray()
+        self._blocks(ciphertext, self._decrypt_block, plaintext)
+        return bytes(plaintext)
+
+    def _decrypt_block(self, c0: int, c1: int, plaintext: bytearray) -> None:
+        S = self.S
+        plaintext += struct.pack("<QQ", S[0] ^ c0, S[1] ^ c1)
+        S[0] = c0
+        S[1] = c1
+        ascon_permutation(S, self.b)
+
+    def finalize(self, tag: BytesLike) -> bytes|None:
+        """
+        Decrypt the buffered last block and verify the tag.
+        tag: a bytes object of size 16
+        returns the remaining plaintext or None if verification fails
+        """
+        assert self.phase != "finalized", "cannot finalize twice"
+        assert len(tag) == 16
+        self._start_message()
+        plaintext = ascon_process_ciphertext(self.S, self.b, self.rate, self.buffer)
+        self.buffer.clear()
+        if self._finalize_tag() == tag:
+            return plaintext
+        else:
+            return None
+
+
 # === Ascon AEAD building blocks ===
 
 def ascon_initialize(S: list[int], k: int, rate: int, a: int, b: int, version: int, key: BytesLike, nonce: BytesLike):
@@ -247,7 +1007,7 @@ def ascon_initialize(S: list[int], k: int, rate: int, a: int, b: int, version: i
     taglen = 128
     iv = to_bytes([version, 0, (b<<4) + a]) + int_to_bytes(taglen, 2) + to_bytes([rate, 0, 0])
     S[0], S[1], S[2], S[3], S[4] = bytes_to_state(iv + key + nonce)
-    if debug: printstate(S, "initial value:")
+    if tracing: trace("initial value", S)
 
     ascon_permutation(S, a)
 
@@ -257,7 +1017,7 @@ def ascon_initialize(S: list[int], k: int, rate: int, a: int, b: int, version: i
     S[2] ^= zero_key[2]
     S[3] ^= zero_key[3]
     S[4] ^= zero_key[4]
-    if debug: printstate(S, "initialization:")
+    if tracing: trace("initialization", S)
 
 
 def ascon_process_associated_data(S: list[int], b: int, rate: int, associateddata: BytesLike):
@@ -273,15 +1033,16 @@ def ascon_process_associated_data(S: list[int], b: int, rate: int, associateddat
         a_padding = to_bytes([0x01]) + zero_bytes(rate - (len(associateddata) % rate) - 1)
         a_padded = to_bytes(associateddata) + a_padding
 
-        for block in range(0, len(a_padded), rate):
-            S[0] ^= bytes_to_int(a_padded[block:block+8])
+        a_words = bytes_to_words(a_padded)
+        for w in range(0, len(a_words), rate//8):
+            S[0] ^= a_words[w]
             if rate == 16:
-                S[1] ^= bytes_to_int(a_padded[block+8:block+16])
+                S[1] ^= a_words[w+1]
 
             ascon_permutation(S, b)
 
     S[4] ^= 1<<63
-    if debug: printstate(S, "process associated data:")
+    if tracing: trace("process associated data", S)
 
 
 def ascon_process_plaintext(S: list[int], b: int, rate: int, plaintext: BytesLike):
@@ -297,20 +1058,25 @@ def ascon_process_plaintext(S: list[int], b: int, rate: int, plaintext: BytesLik
     p_padding = to_bytes([0x01]) + zero_bytes(rate-p_lastlen-1)
     p_padded = to_bytes(plaintext) + p_padding
 
+    p_words = bytes_to_words(p_padded)
+    c_words = [0] * len(p_words)
+
     # first t-1 blocks
-    ciphertext = to_bytes([])
-    for block in range(0, len(p_padded) - rate, rate):
-        S[0] ^= bytes_to_int(p_padded[block:block+8])
-        S[1] ^= bytes_to_int(p_padded[block+8:block+16])
-        ciphertext += (int_to_bytes(S[0], 8) + int_to_bytes(S[1], 8))
+    for w in range(0, len(p_words) - 2, 2):
+        S[0] ^= p_words[w]
+        S[1] ^= p_words[w+1]
+        c_words[w] = S[0]
+        c_words[w+1] = S[1]
         ascon_permutation(S, b)
 
     # last block t
-    block = len(p_padded) - rate
-    S[0] ^= bytes_to_int(p_padded[block:block+8])
-    S[1] ^= bytes_to_int(p_padded[block+8:block+16])
-    ciphertext += (int_to_bytes(S[0], 8)[:min(8,p_lastlen)] + int_to_bytes(S[1], 8)[:max(0,p_lastlen-8)])
-    if debug: printstate(S, "process plaintext:")
+    w = len(p_words) - 2
+    S[0] ^= p_words[w]
+    S[1] ^= p_words[w+1]
+    c_words[w] = S[0]
+    c_words[w+1] = S[1]
+    ciphertext = words_to_bytes(c_words)[:len(plaintext)]
+    if tracing: trace("process plaintext", S)
     return ciphertext
 
 
@@ -326,27 +1092,76 @@ def ascon_process_ciphertext(S: list[int], b: int, rate: int, ciphertext: BytesL
     c_lastlen = len(ciphertext) % rate
     c_padded = to_bytes(ciphertext) + zero_bytes(rate - c_lastlen)
 
+    c_words = bytes_to_words(c_padded)
+    p_words = [0] * len(c_words)
+
     # first t-1 blocks
-    plaintext = to_bytes([])
-    for block in range(0, len(c_padded) - rate, rate):
-        Ci = (bytes_to_int(c_padded[block:block+8]), bytes_to_int(c_padded[block+8:block+16]))
-        plaintext += (int_to_bytes(S[0] ^ Ci[0], 8) + int_to_bytes(S[1] ^ Ci[1], 8))
-        S[0] = Ci[0]
-        S[1] = Ci[1]
+    for w in range(0, len(c_words) - 2, 2):
+        p_words[w] = S[0] ^ c_words[w]
+        p_words[w+1] = S[1] ^ c_words[w+1]
+        S[0] = c_words[w]
+        S[1] = c_words[w+1]
         ascon_permutation(S, b)
 
     # last block t
-    block = len(c_padded) - rate
-    c_padx = zero_bytes(c_lastlen) + to_bytes([0x01]) + zero_bytes(rate-c_lastlen-1)
-    c_mask = zero_bytes(c_lastlen) + ff_bytes(rate-c_lastlen)
-    Ci = (bytes_to_int(c_padded[block:block+8]), bytes_to_int(c_padded[block+8:block+16]))
-    plaintext += (int_to_bytes(S[0] ^ Ci[0], 8) + int_to_bytes(S[1] ^ Ci[1], 8))[:c_lastlen]
-    S[0] = (S[0] & bytes_to_int(c_mask[0:8]))  ^ Ci[0] ^ bytes_to_int(c_padx[0:8])
-    S[1] = (S[1] & bytes_to_int(c_mask[8:16])) ^ Ci[1] ^ bytes_to_int(c_padx[8:16])
-    if debug: printstate(S, "process ciphertext:")
+    w = len(c_words) - 2
+    c_padx = bytes_to_words(zero_bytes(c_lastlen) + to_bytes([0x01]) + zero_bytes(rate-c_lastlen-1))
+    c_mask = bytes_to_words(zero_bytes(c_lastlen) + ff_bytes(rate-c_lastlen))
+    p_words[w] = S[0] ^ c_words[w]
+    p_words[w+1] = S[1] ^ c_words[w+1]
+    plaintext = words_to_bytes(p_words)[:len(ciphertext)]
+    S[0] = (S[0] & c_mask[0]) ^ c_words[w]   ^ c_padx[0]
+    S[1] = (S[1] & c_mask[1]) ^ c_words[w+1] ^ c_padx[1]
+    if tracing: trace("process ciphertext", S)
     return plaintext
 
 
+def ascon_absorb_ciphertext(S: list[int], b: int, rate: int, ciphertext: BytesLike, keystream: list[int]|None = None):
+    """
+    Ascon ciphertext processing phase without computing the plaintext - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    rate: block size in bytes (16 for Ascon-AEAD128)
+    ciphertext: a bytes object of arbitrary length
+    keystream: None, or a list that receives the rate words of S before each ciphertext
+               block (see ascon_apply_keystream; only needed to decrypt after verification)
+    returns nothing, updates S
+    """
+    c_lastlen = len(ciphertext) % rate
+    c_padded = to_bytes(ciphertext) + zero_bytes(rate - c_lastlen)
+
+    c_words = bytes_to_words(c_padded)
+
+    # first t-1 blocks: the ciphertext becomes the rate part of the state
+    for w in range(0, len(c_words) - 2, 2):
+        if keystream is not None: keystream += (S[0], S[1])
+        S[0] = c_words[w]
+        S[1] = c_words[w+1]
+        ascon_permutation(S, b)
+
+    # last block t
+    w = len(c_words) - 2
+    if keystream is not None: keystream += (S[0], S[1])
+    c_padx = bytes_to_words(zero_bytes(c_lastlen) + to_bytes([0x01]) + zero_bytes(rate-c_lastlen-1))
+    c_mask = bytes_to_words(zero_bytes(c_lastlen) + ff_bytes(rate-c_lastlen))
+    S[0] = (S[0] & c_mask[0]) ^ c_words[w]   ^ c_padx[0]
+    S[1] = (S[1] & c_mask[1]) ^ c_words[w+1] ^ c_padx[1]
+    if tracing: trace("process ciphertext", S)
+
+
+def ascon_apply_keystream(keystream: list[int], ciphertext: BytesLike, rate: int) -> bytes:
+    """
+    Plaintext from the keystream recorded by ascon_absorb_ciphertext - internal helper function.
+    keystream: the rate words of S before each ciphertext block
+    ciphertext: the same bytes object that was absorbed
+    rate: block size in bytes (16 for Ascon-AEAD128)
+    returns the plaintext
+    """
+    c_padded = to_bytes(ciphertext) + zero_bytes(rate - len(ciphertext) % rate)
+    p_words = [s ^ c for s, c in zip(keystream, bytes_to_words(c_padded))]
+    return words_to_bytes(p_words)[:len(ciphertext)]
+
+
 def ascon_finalize(S: list[int], rate: int, a: int, key: BytesLike):
     """
     Ascon finalization phase - internal helper function.
@@ -365,25 +1180,43 @@ def ascon_finalize(S: list[int], rate: int, a: int, key: BytesLike):
     S[3] ^= bytes_to_int(key[-16:-8])
     S[4] ^= bytes_to_int(key[-8:])
     tag = int_to_bytes(S[3], 8) + int_to_bytes(S[4], 8)
-    if debug: printstate(S, "finalization:")
+    if tracing: trace("finalization", S)
     return tag
 
 
 # === Ascon permutation ===
 
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# round constants c_0, ..., c_11 (p^r uses the last r of them)
+ROUND_CONSTANTS = tuple(0xf0 - r*0x10 + r*0x1 for r in range(12))
+
 def ascon_permutation(S: list[int], rounds: int=1):
     """
     Ascon core permutation for the sponge construction - internal helper function.
     S: Ascon state, a list of 5 64-bit integers
     rounds: number of rounds to perform
     returns nothing, updates S
+    Runs the permutation of the active backend, or the reference permutation
+    if a subscriber wants round events.
+    """
+    if tracing_rounds: ascon_permutation_reference(S, rounds)
+    else: backend.permutation(S, rounds)
+
+
+def ascon_permutation_reference(S: list[int], rounds: int=1):
+    """
+    Ascon core permutation, step by step as in the specification - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    rounds: number of rounds to perform
+    returns nothing, updates S
     """
     assert rounds <= 12
-    if debugpermutation: printwords(S, "permutation input:")
+    if tracing_rounds: trace_round("permutation input", 12-rounds, S)
     for r in range(12-rounds, 12):
         # --- add round constants ---
         S[2] ^= (0xf0 - r*0x10 + r*0x1)
-        if debugpermutation: printwords(S, "round constant addition:")
+        if tracing_rounds: trace_round("round constant addition", r, S)
         # --- substitution layer ---
         S[0] ^= S[4]
         S[4] ^= S[3]
@@ -395,14 +1228,321 @@ def ascon_permutation(S: list[int], rounds: int=1):
         S[0] ^= S[4]
         S[3] ^= S[2]
         S[2] ^= 0XFFFFFFFFFFFFFFFF
-        if debugpermutation: printwords(S, "substitution layer:")
+        if tracing_rounds: trace_round("substitution layer", r, S)
         # --- linear diffusion layer ---
         S[0] ^= rotr(S[0], 19) ^ rotr(S[0], 28)
         S[1] ^= rotr(S[1], 61) ^ rotr(S[1], 39)
         S[2] ^= rotr(S[2],  1) ^ rotr(S[2],  6)
         S[3] ^= rotr(S[3], 10) ^ rotr(S[3], 17)
         S[4] ^= rotr(S[4],  7) ^ rotr(S[4], 41)
-        if debugpermutation: printwords(S, "linear diffusion layer:")
+        if tracing_rounds: trace_round("linear diffusion layer", r, S)
+    if tracing_rounds: trace_round("permutation output", 12, S)
+
+
+def ascon_rounds(S: list[int], constants: tuple[int, ...]):
+    """
+    Ascon rounds without tracing - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    constants: the round constants, one per round to perform
+    returns nothing, updates S
+    """
+    x0, x1, x2, x3, x4 = S
+    M = MASK64
+    for c in constants:
+        # --- add round constants ---
+        x2 ^= c
+        # --- substitution layer ---
+        x0 ^= x4
+        x4 ^= x3
+        x2 ^= x1
+        t0 = x0 ^ (~x1 & x2)
+        t1 = x1 ^ (~x2 & x3)
+        t2 = x2 ^ (~x3 & x4)
+        t3 = x3 ^ (~x4 & x0)
+        t4 = x4 ^ (~x0 & x1)
+        t1 ^= t0
+        t0 ^= t4
+        t3 ^= t2
+        t2 ^= M
+        # --- linear diffusion layer (rotr(t, r) == (t || t) >> r, masked once) ---
+        y = t0 | (t0 << 64); x0 = (t0 ^ (y >> 19) ^ (y >> 28)) & M
+        y = t1 | (t1 << 64); x1 = (t1 ^ (y >> 61) ^ (y >> 39)) & M
+        y = t2 | (t2 << 64); x2 = (t2 ^ (y >>  1) ^ (y >>  6)) & M
+        y = t3 | (t3 << 64); x3 = (t3 ^ (y >> 10) ^ (y >> 17)) & M
+        y = t4 | (t4 << 64); x4 = (t4 ^ (y >>  7) ^ (y >> 41)) & M
+    S[0], S[1], S[2], S[3], S[4] = x0, x1, x2, x3, x4
+
+
+RC12 = ROUND_CONSTANTS
+RC8 = ROUND_CONSTANTS[4:]
+RC6 = ROUND_CONSTANTS[6:]
+
+def ascon_p12(S: list[int]):
+    """Ascon permutation p^12 (initialization, finalization, hashing) - updates S."""
+    ascon_rounds(S, RC12)
+
+def ascon_p8(S: list[int]):
+    """Ascon permutation p^8 (Ascon-AEAD128 data processing) - updates S."""
+    ascon_rounds(S, RC8)
+
+def ascon_p6(S: list[int]):
+    """Ascon permutation p^6 - updates S."""
+    ascon_rounds(S, RC6)
+
+ROUND_PERMUTATIONS = {12: ascon_p12, 8: ascon_p8, 6: ascon_p6}
+
+def ascon_permutation_fast(S: list[int], rounds: int=1):
+    """
+    Ascon core permutation on the round-specialized fast path - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    rounds: number of rounds to perform
+    returns nothing, updates S
+    """
+    assert rounds <= 12
+    permutation = ROUND_PERMUTATIONS.get(rounds)
+    if permutation is not None: permutation(S)
+    else: ascon_rounds(S, ROUND_CONSTANTS[12-rounds:])
+
+
+def ascon_permutation_batch(states, rounds: int=1):
+    """
+    Ascon core permutation on N independent states at once (requires NumPy).
+    states: an array-like of shape (N, 5) with 64-bit integers (one state per row)
+    rounds: number of rounds to perform
+    returns a new uint64 array of shape (N, 5) with the permuted states
+    """
+    assert np is not None, "ascon_permutation_batch requires NumPy"
+    assert rounds <= 12
+    X = np.array(states, dtype=np.uint64).reshape(-1, 5).T.copy()
+    x0, x1, x2, x3, x4 = X  # row views: word i of all N states
+    for r in range(12-rounds, 12):
+        # --- add round constants ---
+        x2 ^= np.uint64(ROUND_CONSTANTS[r])
+        # --- substitution layer ---
+        x0 ^= x4
+        x4 ^= x3
+        x2 ^= x1
+        t0 = ~x0 & x1
+        t1 = ~x1 & x2
+        t2 = ~x2 & x3
+        t3 = ~x3 & x4
+        t4 = ~x4 & x0
+        x0 ^= t1
+        x1 ^= t2
+        x2 ^= t3
+        x3 ^= t4
+        x4 ^= t0
+        x1 ^= x0
+        x0 ^= x4
+        x3 ^= x2
+        np.invert(x2, out=x2)
+        # --- linear diffusion layer ---
+        x0 ^= rotr_batch(x0, 19) ^ rotr_batch(x0, 28)
+        x1 ^= rotr_batch(x1, 61) ^ rotr_batch(x1, 39)
+        x2 ^= rotr_batch(x2,  1) ^ rotr_batch(x2,  6)
+        x3 ^= rotr_batch(x3, 10) ^ rotr_batch(x3, 17)
+        x4 ^= rotr_batch(x4,  7) ^ rotr_batch(x4, 41)
+    return X.T
+
+
+# === Ascon lane-packed batch processing (pure Python, no NumPy) ===
+# Word x_i of K independent states is packed into one 64*K-bit integer
+# (state j in bits 64*j ... 64*j+63), so each XOR/AND/NOT of the round
+# function runs on all K lanes in a single big-integer operation.
+
+@functools.lru_cache(maxsize=64)
+def lane_masks(lanes: int) -> tuple[int, int, dict[int, tuple[int, int]]]:
+    """
+    Lane constants for K=lanes packed states - internal helper function.
+    returns (ones, ones_lsb, rot), where ones has all 64*K bits set, ones_lsb has
+    bit 0 of every lane set, and rot[r] = (lo, hi) masks the parts of a packed
+    word shifted by >> r and << 64-r that stay inside their lane
+    """
+    ones_lsb = int.from_bytes(b"\x01\x00\x00\x00\x00\x00\x00\x00" * lanes, "little")
+    ones = MASK64 * ones_lsb
+    rot = {r: (((1 << (64-r)) - 1) * ones_lsb, ((1 << r) - 1 << (64-r)) * ones_lsb)
+           for r in (1, 6, 7, 10, 17, 19, 28, 39, 41, 61)}
+    return ones, ones_lsb, rot
+
+
+def lanes_pack(words: Sequence[int]) -> int:
+    # one 64-bit word per lane -> packed word
+    return int.from_bytes(struct.pack("<%dQ" % len(words), *words), "little")
+
+def lanes_unpack(word: int, lanes: int) -> tuple[int, ...]:
+    # packed word -> one 64-bit word per lane
+    return struct.unpack("<%dQ" % lanes, word.to_bytes(8*lanes, "little"))
+
+def lanes_pack_bytes(blocks: Iterable[BytesLike]) -> int:
+    # one 8-byte block per lane -> packed word
+    return int.from_bytes(b"".join(blocks), "little")
+
+
+def ascon_permutation_lanes(X: list[int], lanes: int, rounds: int=1):
+    """
+    Ascon core permutation on K lane-packed states - internal helper function.
+    X: 5 packed words (see lanes_pack)
+    lanes: number K of packed states
+    rounds: number of rounds to perform
+    returns nothing, updates X
+    """
+    assert rounds <= 12
+    ones, ones_lsb, rot = lane_masks(lanes)
+    x0, x1, x2, x3, x4 = X
+    l19, h19 = rot[19]; l28, h28 = rot[28]
+    l61, h61 = rot[61]; l39, h39 = rot[39]
+    l1,  h1  = rot[1];  l6,  h6  = rot[6]
+    l10, h10 = rot[10]; l17, h17 = rot[17]
+    l7,  h7  = rot[7];  l41, h41 = rot[41]
+    for c in ROUND_CONSTANTS[12-rounds:]:
+        # --- add round constants ---
+        x2 ^= c * ones_lsb
+        # --- substitution layer ---
+        x0 ^= x4
+        x4 ^= x3
+        x2 ^= x1
+        t0 = x0 ^ ((x1 ^ ones) & x2)
+        t1 = x1 ^ ((x2 ^ ones) & x3)
+        t2 = x2 ^ ((x3 ^ ones) & x4)
+        t3 = x3 ^ ((x4 ^ ones) & x0)
+        t4 = x4 ^ ((x0 ^ ones) & x1)
+        t1 ^= t0
+        t0 ^= t4
+        t3 ^= t2
+        t2 ^= ones
+        # --- linear diffusion layer (per-lane rotations) ---
+        x0 = t0 ^ (t0 >> 19 & l19) ^ (t0 << 45 & h19) ^ (t0 >> 28 & l28) ^ (t0 << 36 & h28)
+        x1 = t1 ^ (t1 >> 61 & l61) ^ (t1 <<  3 & h61) ^ (t1 >> 39 & l39) ^ (t1 << 25 & h39)
+        x2 = t2 ^ (t2 >>  1 & l1)  ^ (t2 << 63 & h1)  ^ (t2 >>  6 & l6)  ^ (t2 << 58 & h6)
+        x3 = t3 ^ (t3 >> 10 & l10) ^ (t3 << 54 & h10) ^ (t3 >> 17 & l17) ^ (t3 << 47 & h17)
+        x4 = t4 ^ (t4 >>  7 & l7)  ^ (t4 << 57 & h7)  ^ (t4 >> 41 & l41) ^ (t4 << 23 & h41)
+    X[0], X[1], X[2], X[3], X[4] = x0, x1, x2, x3, x4
+
+
+def ascon_permutation_batch_lanes(states: Sequence[Sequence[int]], rounds: int=1) -> list[list[int]]:
+    """
+    Ascon core permutation on N independent states at once (pure Python).
+    states: a sequence of N states (5 64-bit integers each)
+    rounds: number of rounds to perform
+    returns a list with the N permuted states
+    """
+    lanes = len(states)
+    if lanes == 0: return []
+    X = [lanes_pack(column) for column in zip(*states)]
+    ascon_permutation_lanes(X, lanes, rounds)
+    return [list(state) for state in zip(*(lanes_unpack(x, lanes) for x in X))]
+
+
+def ascon_encrypt_lanes(jobs: Sequence[tuple[BytesLike, BytesLike, BytesLike, BytesLike]], variant: AsconAeadVariant = "Ascon-AEAD128") -> list[bytes]:
+    """
+    Ascon encryption of many independent messages on lane-packed states (pure Python).
+    jobs: a sequence of (key, nonce, associateddata, plaintext) tuples
+    variant: "Ascon-AEAD128"
+    returns a list with ascon_encrypt(key, nonce, associateddata, plaintext) for every job, in input order
+    Jobs with the same number of AD and plaintext blocks run in lockstep on one packed state.
+    """
+    assert variant == "Ascon-AEAD128"
+    rate = 16
+    groups: dict[tuple[int, int], list[int]] = {}
+    for index, (key, nonce, associateddata, plaintext) in enumerate(jobs):
+        assert len(key) == 16 and len(nonce) == 16
+        adblocks = len(associateddata) // rate + 1 if associateddata else 0
+        groups.setdefault((adblocks, len(plaintext) // rate + 1), []).append(index)
+
+    results: list[bytes] = [b""] * len(jobs)
+    for (adblocks, ptblocks), indices in groups.items():
+        group = [jobs[i] for i in indices]
+        for index, ciphertext in zip(indices, ascon_encrypt_lanes_group(group, adblocks, ptblocks)):
+            results[index] = ciphertext
+    return results
+
+
+def ascon_encrypt_lanes_group(jobs: Sequence[tuple[BytesLike, BytesLike, BytesLike, BytesLike]], adblocks: int, ptblocks: int) -> list[bytes]:
+    # all jobs have adblocks padded AD blocks and ptblocks padded plaintext blocks
+    lanes = len(jobs)
+    rate, a, b = 16, 12, 8
+    keys = [to_bytes(key) for key, _, _, _ in jobs]
+    k0 = lanes_pack_bytes(key[0:8] for key in keys)
+    k1 = lanes_pack_bytes(key[8:16] for key in keys)
+    _, ones_lsb, _ = lane_masks(lanes)
+
+    # Initialization
+    iv = bytes_to_int(to_bytes([1, 0, (b<<4) + a]) + int_to_bytes(128, 2) + to_bytes([rate, 0, 0]))
+    n0 = lanes_pack_bytes(to_bytes(nonce[0:8]) for _, nonce, _, _ in jobs)
+    n1 = lanes_pack_bytes(to_bytes(nonce[8:16]) for _, nonce, _, _ in jobs)
+    X = [iv * ones_lsb, k0, k1, n0, n1]
+    ascon_permutation_lanes(X, lanes, a)
+    X[3] ^= k0
+    X[4] ^= k1
+
+    # Associated Data
+    if adblocks:
+        a_padded = [to_bytes(ad) + b"\x01" + zero_bytes(rate*adblocks - len(ad) - 1) for _, _, ad, _ in jobs]
+        for i in range(0, rate*adblocks, rate):
+            X[0] ^= lanes_pack_bytes(ad[i:i+8] for ad in a_padded)
+            X[1] ^= lanes_pack_bytes(ad[i+8:i+16] for ad in a_padded)
+            ascon_permutation_lanes(X, lanes, b)
+    X[4] ^= (1<<63) * ones_lsb
+
+    # Plaintext (padded blocks; ciphertext words are the rate part after XOR)
+    p_padded = [to_bytes(pt) + b"\x01" + zero_bytes(rate*ptblocks - len(pt) - 1) for _, _, _, pt in jobs]
+    c_parts = [[] for _ in range(lanes)]
+    for i in range(0, rate*ptblocks, rate):
+        if i: ascon_permutation_lanes(X, lanes, b)
+        X[0] ^= lanes_pack_bytes(pt[i:i+8] for pt in p_padded)
+        X[1] ^= lanes_pack_bytes(pt[i+8:i+16] for pt in p_padded)
+        c0 = X[0].to_bytes(8*lanes, "little")
+        c1 = X[1].to_bytes(8*lanes, "little")
+        for j, parts in enumerate(c_parts):
+            parts.append(c0[8*j:8*j+8])
+            parts.append(c1[8*j:8*j+8])
+
+    # Finalization
+    X[2] ^= k0
+    X[3] ^= k1
+    ascon_permutation_lanes(X, lanes, a)
+    t0 = (X[3] ^ k0).to_bytes(8*lanes, "little")
+    t1 = (X[4] ^ k1).to_bytes(8*lanes, "little")
+    return [b"".join(parts)[:len(pt)] + t0[8*j:8*j+8] + t1[8*j:8*j+8]
+            for j, (parts, (_, _, _, pt)) in enumerate(zip(c_parts, jobs))]
+
+
+def ascon_hash_lanes(messages: Sequence[BytesLike], variant: AsconHashVariant|AsconCxofVariant = "Ascon-Hash256", hashlength: int = 32, customizations: Sequence[BytesLike]|None = None) -> list[bytes]:
+    """
+    Ascon hash/XOF of many independent messages on lane-packed states (pure Python).
+    messages: a sequence of bytes objects of arbitrary length
+    variant, hashlength: as in ascon_hash
+    customizations: None, or one customization string per message (only for Ascon-CXOF128)
+    returns a list with ascon_hash(message, variant, hashlength, customization) for every message, in input order
+    Messages with the same number of blocks run in lockstep on one packed state.
+    """
+    assert variant in ("Ascon-Hash256", "Ascon-XOF128", "Ascon-CXOF128")
+    if variant == "Ascon-Hash256": assert hashlength == 32
+    if customizations is None: customizations = [b""] * len(messages)
+    assert len(customizations) == len(messages)
+    rate = 8
+    groups: dict[int, list[int]] = {}
+    for index, message in enumerate(messages):
+        groups.setdefault(len(message) // rate + 1, []).append(index)
+
+    results: list[bytes] = [b""] * len(messages)
+    for mblocks, indices in groups.items():
+        lanes = len(indices)
+        states = [ascon_hash_initialize(variant, customizations[i]) for i in indices]
+        X = [lanes_pack(column) for column in zip(*states)]
+        m_padded = [to_bytes(messages[i]) + b"\x01" + zero_bytes(rate*mblocks - len(messages[i]) - 1) for i in indices]
+        for i in range(0, rate*mblocks, rate):
+            X[0] ^= lanes_pack_bytes(m[i:i+8] for m in m_padded)
+            ascon_permutation_lanes(X, lanes, 12)
+        h_parts = [[] for _ in range(lanes)]
+        for i in range(0, hashlength, rate):
+            if i: ascon_permutation_lanes(X, lanes, 12)
+            h = X[0].to_bytes(8*lanes, "little")
+            for j, parts in enumerate(h_parts):
+                parts.append(h[8*j:8*j+8])
+        for index, parts in zip(indices, h_parts):
+            results[index] = b"".join(parts)[:hashlength]
+    return results
 
 
 # === helper functions ===
@@ -426,7 +1566,16 @@ def bytes_to_int(bytes: BytesLike) -> int:
     return sum([bi << (i*8) for i, bi in enumerate(to_bytes(bytes))])
 
 def bytes_to_state(bytes: bytes) -> list[int]:
-    return [bytes_to_int(bytes[8*w:8*(w+1)]) for w in range(5)]
+    return list(bytes_to_words(bytes[0:40]))
+
+def bytes_to_words(bytes: BytesLike) -> Sequence[int]:
+    # all little-endian 64-bit words of bytes (length must be a multiple of 8) in one step
+    if sys.byteorder == "little":
+        return memoryview(bytes).cast("B").cast("Q")
+    return [w for (w,) in struct.iter_unpack("<Q", bytes)]
+
+def words_to_bytes(words: Sequence[int]) -> bytes:
+    return struct.pack("<%dQ" % len(words), *words)
 
 def int_to_bytes(integer: int, nbytes: int) -> bytes:
     return integer.to_bytes(nbytes, 'little')
@@ -434,6 +1583,9 @@ def int_to_bytes(integer: int, nbytes: int) -> bytes:
 def rotr(val: int, r: int) -> int:
     return (val >> r) | ((val & (1<<r)-1) << (64-r))
 
+def rotr_batch(val, r: int):
+    return (val >> np.uint64(r)) | (val << np.uint64(64-r))
+
 def bytes_to_hex(b: bytes) -> str:
     return b.hex()
 
@@ -446,6 +1598,283 @@ def printwords(S: list[int], description: str = "") -> None:
     print("\n".join(["  x{i}={s:016x}".format(**locals()) for i, s in enumerate(S)]))
 
 
+# === Ascon tracing ===
+# Phase events are emitted after each phase of a mode (description, -1, S);
+# round events after each layer of the reference permutation (layer, r, S),
+# where r is the index of the round constant (0..11, 12 for the output).
+
+trace_subscribers: list[Callable[[str, int, Sequence[int]], None]] = []
+trace_round_subscribers: list[Callable[[str, int, Sequence[int]], None]] = []
+
+def trace_subscribe(callback: Callable[[str, int, Sequence[int]], None], rounds: bool = False) -> Callable[[str, int, Sequence[int]], None]:
+    """
+    Attach a trace subscriber.
+    callback: called as callback(phase, round, S) for every event (S must not be kept, copy it)
+    rounds: also deliver round events (routes every permutation through the reference permutation)
+    returns callback
+    """
+    global tracing, tracing_rounds
+    trace_subscribers.append(callback)
+    if rounds: trace_round_subscribers.append(callback)
+    tracing = True
+    tracing_rounds = len(trace_round_subscribers) > 0
+    return callback
+
+def trace_unsubscribe(callback: Callable[[str, int, Sequence[int]], None]) -> None:
+    """
+    Detach a trace subscriber (attached with trace_subscribe).
+    """
+    global tracing, tracing_rounds
+    trace_subscribers.remove(callback)
+    if callback in trace_round_subscribers: trace_round_subscribers.remove(callback)
+    tracing = len(trace_subscribers) > 0
+    tracing_rounds = len(trace_round_subscribers) > 0
+
+def trace(phase: str, S: Sequence[int]) -> None:
+    # emit a phase event (only called if tracing)
+    for callback in trace_subscribers:
+        callback(phase, -1, S)
+
+def trace_round(phase: str, r: int, S: Sequence[int]) -> None:
+    # emit a round event (only called if tracing_rounds)
+    for callback in trace_round_subscribers:
+        callback(phase, r, S)
+
+def trace_print(phase: str, r: int, S: Sequence[int]) -> None:
+    """
+    Trace subscriber printing every event to stdout.
+    """
+    if r < 0: printstate(S, phase + ":")
+    else: printwords(S, phase + ":")
+
+
+class AsconTraceBuffer:
+    """
+    Ring buffer of trace events, preallocated for capacity records
+    (phase, round, x0, x1, x2, x3, x4); the oldest records are overwritten.
+    Used as a context manager, it is subscribed while the block runs:
+        with AsconTraceBuffer(256, rounds=True) as buffer:
+            ascon_encrypt(key, nonce, associateddata, plaintext)
+        for phase, r, x0, x1, x2, x3, x4 in buffer.events(): ...
+    """
+
+    def __init__(self, capacity: int = 1024, rounds: bool = False) -> None:
+        assert capacity > 0
+        self.capacity = capacity
+        self.rounds = rounds
+        self.records = [["", 0, 0, 0, 0, 0, 0] for _ in range(capacity)]
+        self.count = 0  # number of events seen so far
+
+    def __call__(self, phase: str, r: int, S: Sequence[int]) -> None:
+        record = self.records[self.count % self.capacity]
+        record[0] = phase
+        record[1] = r
+        record[2], record[3], record[4], record[5], record[6] = S
+        self.count += 1
+
+    def __enter__(self) -> AsconTraceBuffer:
+        trace_subscribe(self, self.rounds)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        trace_unsubscribe(self)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """number of events overwritten because the buffer was full"""
+        return max(self.count - self.capacity, 0)
+
+    def events(self) -> list[tuple]:
+        """
+        returns the buffered records as (phase, round, x0, x1, x2, x3, x4) tuples, oldest first
+        """
+        start = self.count - len(self)
+        return [tuple(self.records[i % self.capacity]) for i in range(start, self.count)]
+
+    def clear(self) -> None:
+        self.count = 0
+
+
+# === Ascon backends ===
+# Every entry point of this module runs on the active backend: ascon_permutation()
+# for single states, and ascon_permute_many/ascon_encrypt_many/ascon_hash_many for
+# batches of independent inputs. A backend is activated only after it has passed
+# the known-answer self-test. The environment variable ASCON_BACKEND forces a
+# backend by name (e.g. ASCON_BACKEND=reference to debug a HW mismatch).
+
+class AsconBackend:
+    """
+    A set of implementations of the Ascon primitives.
+    name: registry name
+    speed: rank for the automatic selection (the fastest available backend wins)
+    available: False if a required module is missing
+    precomputed: True if precomputed hash initialization states may be used
+    permutation(S, rounds): scalar permutation, updates S
+    permute_many(states, rounds): returns the list of permuted states
+    encrypt_many(jobs, variant): returns ascon_encrypt(*job, variant) for every job
+    hash_many(messages, variant, hashlength, customizations): returns ascon_hash() for every message
+    """
+
+    def __init__(self, name: str, speed: int, permutation: Callable, permute_many: Callable,
+                 encrypt_many: Callable, hash_many: Callable, available: bool = True, precomputed: bool = True) -> None:
+        self.name = name
+        self.speed = speed
+        self.available = available
+        self.precomputed = precomputed
+        self.permutation = permutation
+        self.permute_many = permute_many
+        self.encrypt_many = encrypt_many
+        self.hash_many = hash_many
+
+    def __repr__(self) -> str:
+        return "AsconBackend({name!r})".format(name=self.name)
+
+
+def ascon_permute_many(states: Sequence[Sequence[int]], rounds: int=1) -> list[list[int]]:
+    """
+    Ascon core permutation on N independent states (active backend).
+    states: a sequence of N states (5 64-bit integers each)
+    rounds: number of rounds to perform
+    returns a list with the N permuted states
+    """
+    if len(states) == 0: return []
+    return backend.permute_many(states, rounds)
+
+def ascon_encrypt_many(jobs: Sequence[tuple[BytesLike, BytesLike, BytesLike, BytesLike]], variant: AsconAeadVariant = "Ascon-AEAD128") -> list[bytes]:
+    """
+    Ascon encryption of many independent messages (active backend).
+    jobs: a sequence of (key, nonce, associateddata, plaintext) tuples
+    variant: "Ascon-AEAD128"
+    returns a list with ascon_encrypt(key, nonce, associateddata, plaintext) for every job, in input order
+    """
+    return backend.encrypt_many(jobs, variant)
+
+def ascon_hash_many(messages: Sequence[BytesLike], variant: AsconHashVariant|AsconCxofVariant = "Ascon-Hash256", hashlength: int = 32, customizations: Sequence[BytesLike]|None = None) -> list[bytes]:
+    """
+    Ascon hash/XOF of many independent messages (active backend).
+    messages: a sequence of bytes objects of arbitrary length
+    variant, hashlength: as in ascon_hash
+    customizations: None, or one customization string per message (only for Ascon-CXOF128)
+    returns a list with ascon_hash(message, variant, hashlength, customization) for every message, in input order
+    """
+    return backend.hash_many(messages, variant, hashlength, customizations)
+
+
+def permute_many_scalar(states: Sequence[Sequence[int]], rounds: int=1) -> list[list[int]]:
+    outs = []
+    for state_in in states:
+        state = list(state_in)
+        ascon_permutation(state, rounds)
+        outs.append(state)
+    return outs
+
+def permute_many_numpy(states: Sequence[Sequence[int]], rounds: int=1) -> list[list[int]]:
+    return ascon_permutation_batch(states, rounds).tolist()
+
+def encrypt_many_scalar(jobs: Sequence[tuple[BytesLike, BytesLike, BytesLike, BytesLike]], variant: AsconAeadVariant = "Ascon-AEAD128") -> list[bytes]:
+    return [ascon_encrypt(key, nonce, associateddata, plaintext, variant) for key, nonce, associateddata, plaintext in jobs]
+
+def hash_many_scalar(messages: Sequence[BytesLike], variant: AsconHashVariant|AsconCxofVariant = "Ascon-Hash256", hashlength: int = 32, customizations: Sequence[BytesLike]|None = None) -> list[bytes]:
+    if customizations is None: customizations = [b""] * len(messages)
+    assert len(customizations) == len(messages)
+    return [ascon_hash(message, variant, hashlength, customization) for message, customization in zip(messages, customizations)]
+
+
+BACKENDS: dict[str, AsconBackend] = {}
+
+def register_backend(new_backend: AsconBackend) -> None:
+    """
+    Add a backend to the registry (replaces a backend of the same name).
+    """
+    BACKENDS[new_backend.name] = new_backend
+    backend_selftest.cache_clear()
+
+
+# known answers: p^12 of the hash IVs, and one multi-block vector of each LWC KAT
+SELFTEST_PERMUTATION = [
+    ([bytes_to_int(to_bytes([version, 0, 0xcc]) + int_to_bytes(taglen, 2) + to_bytes([8, 0, 0])), 0, 0, 0, 0], list(HASH_INITIALIZED_STATES[variant]))
+    for variant, version, taglen in (("Ascon-Hash256", 2, 256), ("Ascon-XOF128", 3, 0), ("Ascon-CXOF128", 4, 0))
+]
+SELFTEST_AEAD = (bytes(range(16)), bytes(range(16)), bytes(range(17)), bytes(range(17)),
+                 bytes.fromhex("9813B7013089DB863A742A4C13F1408E9781D46986CBC03B3E6A335581EB9DA954"))
+SELFTEST_HASH = (bytes(range(9)), bytes.fromhex("94269C30E0296E1EC86655041841823EFA1927F520FD58C8E9BCE6197878C1A6"))
+
+@functools.lru_cache(maxsize=None)
+def backend_selftest(name: str) -> bool:
+    """
+    Known-answer self-test of a registered backend (run once per backend and process).
+    Must run while the backend is active, since its scalar parts call ascon_permutation().
+    returns True if all primitives of the backend give the expected results
+    """
+    candidate = BACKENDS[name]
+    if not candidate.available: return False
+    for state_in, state_out in SELFTEST_PERMUTATION:
+        S = list(state_in)
+        candidate.permutation(S, 12)
+        if S != state_out: return False
+    if candidate.permute_many([state_in for state_in, _ in SELFTEST_PERMUTATION], 12) != [state_out for _, state_out in SELFTEST_PERMUTATION]:
+        return False
+    key, nonce, associateddata, plaintext, ciphertext = SELFTEST_AEAD
+    if candidate.encrypt_many([(key, nonce, associateddata, plaintext)] * 2, "Ascon-AEAD128") != [ciphertext] * 2:
+        return False
+    message, tag = SELFTEST_HASH
+    if candidate.hash_many([message] * 2, "Ascon-Hash256", 32, None) != [tag] * 2:
+        return False
+    return True
+
+
+def select_backend(name: str|None = None) -> AsconBackend:
+    """
+    Activate a backend after its self-test.
+    name: a registered backend name, or None for the fastest available backend
+          that passes its self-test (or the one named by ASCON_BACKEND, if set)
+    returns the active backend
+    """
+    global backend
+    if name is None: name = os.environ.get("ASCON_BACKEND") or None
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError("unknown Ascon backend {name!r} (valid backends: {names})".format(name=name, names=backend_names()))
+        candidates = [BACKENDS[name]]
+        if not candidates[0].available:
+            raise RuntimeError("Ascon backend {name!r} is not available, a required module is missing (valid backends: {names})".format(name=name, names=backend_names()))
+    else:
+        candidates = sorted(BACKENDS.values(), key=lambda b: b.speed, reverse=True)
+    previous = backend
+    for candidate in candidates:
+        if not candidate.available: continue
+        backend = candidate
+        if backend_selftest(candidate.name): return backend
+        backend = previous
+    if name is not None:
+        raise RuntimeError("Ascon backend {name!r} failed its self-test (valid backends: {names})".format(name=name, names=backend_names()))
+    raise RuntimeError("no Ascon backend passed its self-test (registered backends: {names})".format(names=backend_names()))
+
+def backend_names() -> str:
+    """
+    returns the registered backend names, marking those that are not available
+    """
+    return ", ".join(b.name if b.available else "{name} (not available)".format(name=b.name) for b in BACKENDS.values())
+
+def get_backend() -> AsconBackend:
+    """
+    returns the active backend
+    """
+    return backend
+
+
+register_backend(AsconBackend("reference", 0, ascon_permutation_reference, permute_many_scalar, encrypt_many_scalar, hash_many_scalar, precomputed=False))
+register_backend(AsconBackend("scalar", 1, ascon_permutation_fast, permute_many_scalar, encrypt_many_scalar, hash_many_scalar))
+register_backend(AsconBackend("lanes", 2, ascon_permutation_fast, ascon_permutation_batch_lanes, ascon_encrypt_lanes, ascon_hash_lanes))
+register_backend(AsconBackend("numpy", 3, ascon_permutation_fast, permute_many_numpy, ascon_encrypt_lanes, ascon_hash_lanes, available=np is not None))
+
+backend: AsconBackend = BACKENDS["reference"]
+select_backend()
+
+
 # === some demo if called directly ===
 
 def demo_print(data: list[tuple[str, bytes|None]]) -> None:
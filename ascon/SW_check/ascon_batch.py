@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Multi-core batch engine for Ascon reference computations.
+
+All inputs of a batch are packed once into a multiprocessing.shared_memory
+block, so no message data is pickled between processes. Each worker passes
+zero-copy memoryview slices of its chunk to the batch API of the active backend
+of ascon.py (ascon_encrypt_many / ascon_hash_many, see select_backend) and copies
+the results into a second shared block. Results are returned in input order.
+Small batches (below PARALLEL_MIN_JOBS) run in-process without shared memory,
+and a caller with many batches can pass one process pool for all of them.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Sequence
+
+import ascon
+from ascon import BytesLike, AsconAeadVariant, AsconHashVariant, AsconCxofVariant
+
+AeadJob = tuple[BytesLike, BytesLike, BytesLike, BytesLike]  # key, nonce, associateddata, plaintext
+
+CHUNKS_PER_WORKER = 4  # more chunks than workers for load balancing
+PARALLEL_MIN_JOBS = 2048  # default: smaller batches are not worth the process start-up
+
+
+# === public interface ===
+
+def batch_encrypt(jobs: Sequence[AeadJob], workers: int|None = None, variant: AsconAeadVariant = "Ascon-AEAD128",
+                  pool: Executor|None = None) -> list[bytes]:
+    """
+    Ascon encryption of many independent messages on a process pool.
+    jobs: a sequence of (key, nonce, associateddata, plaintext) tuples
+    workers: number of worker processes (default: all cores, or in-process below PARALLEL_MIN_JOBS jobs; 1 runs in-process)
+    variant: "Ascon-AEAD128"
+    pool: process pool to reuse across calls (with workers = its number of processes), default: a new pool per call
+    returns a list with ascon_encrypt(key, nonce, associateddata, plaintext) for every job, in input order
+    """
+    workers = effective_workers(len(jobs), workers)
+    if workers <= 1: return ascon.ascon_encrypt_many(jobs, variant)
+    # input layout per job: key || nonce || associateddata || plaintext
+    layout = []
+    in_size = out_size = 0
+    for key, nonce, associateddata, plaintext in jobs:
+        assert len(key) == 16 and len(nonce) == 16
+        layout.append((in_size, len(associateddata), len(plaintext), out_size))
+        in_size += 32 + len(associateddata) + len(plaintext)
+        out_size += len(plaintext) + 16
+
+    with SharedBlock(in_size) as shm_in, SharedBlock(out_size) as shm_out:
+        buf = shm_in.buf
+        for (key, nonce, associateddata, plaintext), (in_off, adlen, ptlen, _) in zip(jobs, layout):
+            buf[in_off:in_off+16] = key
+            buf[in_off+16:in_off+32] = nonce
+            buf[in_off+32:in_off+32+adlen] = associateddata
+            buf[in_off+32+adlen:in_off+32+adlen+ptlen] = plaintext
+        del buf
+        run_chunks(encrypt_chunk, shm_in.name, shm_out.name, layout, workers, pool, variant)
+        return [bytes(shm_out.buf[out_off:out_off+ptlen+16]) for (_, _, ptlen, out_off) in layout]
+
+
+def batch_hash(messages: Sequence[BytesLike], variant: AsconHashVariant|AsconCxofVariant = "Ascon-Hash256", hashlength: int = 32,
+               customizations: Sequence[BytesLike]|None = None, workers: int|None = None, pool: Executor|None = None) -> list[bytes]:
+    """
+    Ascon hash/XOF of many independent messages on a process pool.
+    messages: a sequence of bytes objects of arbitrary length
+    variant, hashlength: as in ascon_hash
+    customizations: None, or one customization string per message (only for Ascon-CXOF128)
+    workers: number of worker processes (default: all cores, or in-process below PARALLEL_MIN_JOBS messages; 1 runs in-process)
+    pool: process pool to reuse across calls (with workers = its number of processes), default: a new pool per call
+    returns a list with ascon_hash(message, variant, hashlength, customization) for every message, in input order
+    """
+    if variant == "Ascon-Hash256": assert hashlength == 32
+    if customizations is None: customizations = [b""] * len(messages)
+    assert len(customizations) == len(messages)
+    workers = effective_workers(len(messages), workers)
+    if workers <= 1: return ascon.ascon_hash_many(messages, variant, hashlength, customizations)
+
+    # input layout per job: customization || message
+    layout = []
+    in_size = 0
+    for index, (message, customization) in enumerate(zip(messages, customizations)):
+        layout.append((in_size, len(customization), len(message), index * hashlength))
+        in_size += len(customization) + len(message)
+
+    with SharedBlock(in_size) as shm_in, SharedBlock(len(messages) * hashlength) as shm_out:
+        buf = shm_in.buf
+        for (message, customization), (in_off, zlen, mlen, _) in zip(zip(messages, customizations), layout):
+            buf[in_off:in_off+zlen] = customization
+            buf[in_off+zlen:in_off+zlen+mlen] = message
+        del buf
+        run_chunks(hash_chunk, shm_in.name, shm_out.name, layout, workers, pool, variant, hashlength)
+        return [bytes(shm_out.buf[out_off:out_off+hashlength]) for (_, _, _, out_off) in layout]
+
+
+# === worker side ===
+
+def encrypt_chunk(in_name: str, out_name: str, layout: list[tuple[int, int, int, int]], variant: AsconAeadVariant) -> None:
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        src, dst = shm_in.buf, shm_out.buf
+        # zero-copy views into the input block
+        jobs = [(src[in_off:in_off+16],
+                 src[in_off+16:in_off+32],
+                 src[in_off+32:in_off+32+adlen],
+                 src[in_off+32+adlen:in_off+32+adlen+ptlen])
+                for in_off, adlen, ptlen, _ in layout]
+        for (_, _, ptlen, out_off), ciphertext in zip(layout, ascon.ascon_encrypt_many(jobs, variant)):
+            dst[out_off:out_off+ptlen+16] = ciphertext
+        del src, dst, jobs  # release all views before close()
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+def hash_chunk(in_name: str, out_name: str, layout: list[tuple[int, int, int, int]], variant: AsconHashVariant|AsconCxofVariant, hashlength: int) -> None:
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        src, dst = shm_in.buf, shm_out.buf
+        # zero-copy views into the input block
+        customizations = [src[in_off:in_off+zlen] for in_off, zlen, _, _ in layout]
+        messages = [src[in_off+zlen:in_off+zlen+mlen] for in_off, zlen, mlen, _ in layout]
+        for (_, _, _, out_off), tag in zip(layout, ascon.ascon_hash_many(messages, variant, hashlength, customizations)):
+            dst[out_off:out_off+hashlength] = tag
+        del src, dst, customizations, messages  # release all views before close()
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+# === helpers ===
+
+class SharedBlock(shared_memory.SharedMemory):
+    """
+    Shared memory block owned by the calling process, unlinked on exit.
+    """
+
+    def __init__(self, size: int) -> None:
+        super().__init__(create=True, size=max(size, 1))  # size 0 is not allowed
+
+    def __enter__(self) -> SharedBlock:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+        self.unlink()
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def effective_workers(njobs: int, workers: int|None) -> int:
+    # default: all cores, but in-process for batches too small to amortize the pool
+    if workers is None: workers = default_workers() if njobs >= PARALLEL_MIN_JOBS else 1
+    return workers if njobs > 1 else 1
+
+
+def run_chunks(worker, in_name: str, out_name: str, layout: list, workers: int, pool: Executor|None, *args: object) -> None:
+    # split layout into contiguous chunks and run worker(in_name, out_name, chunk, *args) on each
+    nchunks = min(len(layout), workers * CHUNKS_PER_WORKER)
+    size = -(-len(layout) // nchunks)
+    chunks = [layout[i:i+size] for i in range(0, len(layout), size)]
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=workers) as own_pool:
+            run_futures(own_pool, worker, in_name, out_name, chunks, *args)
+    else:
+        run_futures(pool, worker, in_name, out_name, chunks, *args)
+
+
+def run_futures(pool: Executor, worker, in_name: str, out_name: str, chunks: list[list], *args: object) -> None:
+    for future in [pool.submit(worker, in_name, out_name, chunk, *args) for chunk in chunks]:
+        future.result()  # re-raises worker errors
+
+
+if __name__ == "__main__":
+    import time
+    jobs = [(ascon.get_random_bytes(16), ascon.get_random_bytes(16), b"ASCON", ascon.get_random_bytes(i % 97)) for i in range(2 * PARALLEL_MIN_JOBS)]
+    start = time.time()
+    results = batch_encrypt(jobs)
+    print("batch_encrypt: {n} jobs on {w} workers in {t:.2f}s".format(n=len(jobs), w=effective_workers(len(jobs), None), t=time.time() - start))
+    assert all(ct == ascon.ascon_encrypt(*job) for job, ct in zip(jobs, results))
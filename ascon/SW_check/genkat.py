@@ -5,21 +5,33 @@ KAT implementation for NIST (based on TestVectorGen.zip)
 """
 from __future__ import annotations
 
+import argparse
 import ascon
-import sys
-from writer import MultipleWriter
-from typing import Literal
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from writer import MultipleWriter, merge_shards
+from typing import Callable, Literal
+
+Shard = tuple[int, int]  # (index, number of shards)
 
 def kat_bytes(length: int) -> bytes:
     return bytes(bytearray([i % 256 for i in range(length)]))
 
-def kat_aead(variant: ascon.AsconAeadVariant) -> None:
-    MAX_MESSAGE_LENGTH = 32
-    MAX_ASSOCIATED_DATA_LENGTH = 32
+def shard_counts(total: int, shard: Shard) -> range:
+    # contiguous part of the Count values 1..total written by shard (index, n)
+    index, n = shard
+    return range(1 + total * index // n, 1 + total * (index + 1) // n)
+
+def kat_aead(variant: ascon.AsconAeadVariant, max_message_length: int = 32, max_associated_data_length: int = 32, verify_every: int = 0,
+             shard: Shard = (0, 1), prefix: str = "") -> str:
+    MAX_MESSAGE_LENGTH = max_message_length
+    MAX_ASSOCIATED_DATA_LENGTH = max_associated_data_length
 
     klen = 16  # =CRYPTO_KEYBYTES
     nlen = 16  # =CRYPTO_NPUBBYTES
     tlen = 16  # <=CRYPTO_ABYTES
+    rate = 16  # bytes
     filename = "LWC_AEAD_KAT_{klenbits}_{nlenbits}".format(klenbits=klen*8, nlenbits=nlen*8)
     assert variant in ["Ascon-AEAD128"]
 
@@ -28,28 +40,52 @@ def kat_aead(variant: ascon.AsconAeadVariant) -> None:
     msg   = kat_bytes(MAX_MESSAGE_LENGTH)
     ad    = kat_bytes(MAX_ASSOCIATED_DATA_LENGTH)
 
-    with MultipleWriter(filename) as w:
+    # key and nonce are fixed: the state after the associated data depends on adlen only
+    running = []
+    for adlen in range(MAX_ASSOCIATED_DATA_LENGTH+1):
+        e = ascon.AsconAEADEncryptor(key, nonce, variant)
+        e.update_ad(ad[:adlen])
+        e.update(b"")  # last AD block + domain separation
+        running.append(e)
+    # ciphertext of the full message blocks absorbed so far, per adlen
+    prefixes = [b""] * (MAX_ASSOCIATED_DATA_LENGTH+1)
+
+    counts = shard_counts((MAX_MESSAGE_LENGTH+1) * (MAX_ASSOCIATED_DATA_LENGTH+1), shard)
+    with MultipleWriter(prefix + filename) as w:
         count = 1
         for mlen in range(MAX_MESSAGE_LENGTH+1):
+            if mlen > 0 and mlen % rate == 0:
+                # one more full message block: advance all running states
+                for adlen, e in enumerate(running):
+                    prefixes[adlen] += e.update(msg[mlen-rate:mlen])
             for adlen in range(MAX_ASSOCIATED_DATA_LENGTH+1):
+                if count not in counts:
+                    count += 1
+                    continue
                 w.open()
                 w.append("Count", count)
-                count += 1
                 w.append("Key", key, klen)
                 w.append("Nonce", nonce, nlen)
                 w.append("PT", msg, mlen)
                 w.append("AD", ad, adlen)
-                ct = ascon.ascon_encrypt(key, nonce, ad[:adlen], msg[:mlen], variant)
+                e = running[adlen].copy()
+                e.update(msg[mlen - mlen % rate:mlen])
+                ct = prefixes[adlen] + e.finalize()
                 assert len(ct) == mlen + tlen
                 w.append("CT", ct, len(ct))
-                msg2 = ascon.ascon_decrypt(key, nonce, ad[:adlen], ct, variant)
-                assert msg2 is not None
-                assert len(msg2) == mlen
-                assert msg2 == msg[:mlen]
+                if verify_every and count % verify_every == 0:
+                    # sampled round-trip check
+                    msg2 = ascon.ascon_decrypt(key, nonce, ad[:adlen], ct, variant)
+                    assert msg2 is not None
+                    assert len(msg2) == mlen
+                    assert msg2 == msg[:mlen]
+                    assert ct == ascon.ascon_encrypt(key, nonce, ad[:adlen], msg[:mlen], variant)
+                count += 1
                 w.close()
+    return filename
 
 
-def kat_hash(variant: ascon.AsconHashVariant|ascon.AsconCxofVariant = "Ascon-Hash256") -> None:
+def kat_hash(variant: ascon.AsconHashVariant|ascon.AsconCxofVariant = "Ascon-Hash256", shard: Shard = (0, 1), prefix: str = "") -> str:
     MAX_MESSAGE_LENGTH = 1024
     hlen = 32  # =CRYPTO_BYTES
     hashtypes = {"Ascon-Hash256": "HASH",
@@ -60,19 +96,27 @@ def kat_hash(variant: ascon.AsconHashVariant|ascon.AsconCxofVariant = "Ascon-Has
     filename = "LWC_{hashtype}_KAT_{hlenbits}".format(hashtype=hashtypes[variant], hlenbits=hlen*8)
 
     msg = kat_bytes(MAX_MESSAGE_LENGTH)
-    with MultipleWriter(filename) as w:
+    # all messages are prefixes of msg: absorb it once, finalize a copy at each length
+    running = ascon.AsconHash(variant)
+    counts = shard_counts(MAX_MESSAGE_LENGTH+1, shard)
+    with MultipleWriter(prefix + filename) as w:
         count = 1
         for mlen in range(MAX_MESSAGE_LENGTH+1):
+            if mlen > 0: running.update(msg[mlen-1:mlen])
+            if count not in counts:
+                count += 1
+                continue
             w.open()
             w.append("Count", count)
             count += 1
             w.append("Msg", msg, mlen)
-            tag = ascon.ascon_hash(msg[:mlen], variant, hlen)
+            tag = running.digest(hlen)
             w.append("MD", tag, hlen)
             w.close()
+    return filename
 
 
-def kat_cxof(variant: Literal["Ascon-CXOF128"] = "Ascon-CXOF128") -> None:
+def kat_cxof(variant: Literal["Ascon-CXOF128"] = "Ascon-CXOF128", shard: Shard = (0, 1), prefix: str = "") -> str:
     # proposed KAT format - not official reference
     MAX_MESSAGE_LENGTH = 32
     MAX_CUSTOMIZATION_LENGTH = 32
@@ -84,21 +128,30 @@ def kat_cxof(variant: Literal["Ascon-CXOF128"] = "Ascon-CXOF128") -> None:
 
     msg    = kat_bytes(MAX_MESSAGE_LENGTH)
     custom = kat_bytes(MAX_CUSTOMIZATION_LENGTH)
-    with MultipleWriter(filename) as w:
+    # one running absorb state per customization length, forked at each message length
+    running = [ascon.AsconHash(variant, customization=custom[:zlen]) for zlen in range(MAX_CUSTOMIZATION_LENGTH+1)]
+    counts = shard_counts((MAX_MESSAGE_LENGTH+1) * (MAX_CUSTOMIZATION_LENGTH+1), shard)
+    with MultipleWriter(prefix + filename) as w:
         count = 1
         for mlen in range(MAX_MESSAGE_LENGTH+1):
             for zlen in range(MAX_CUSTOMIZATION_LENGTH+1):
+                if mlen > 0 and zlen == 0:
+                    for h in running: h.update(msg[mlen-1:mlen])
+                if count not in counts:
+                    count += 1
+                    continue
                 w.open()
                 w.append("Count", count)
                 count += 1
                 w.append("Msg", msg, mlen)
                 w.append("Z", custom, zlen) # or CS?
-                tag = ascon.ascon_hash(msg[:mlen], variant, hlen, custom[:zlen])
+                tag = running[zlen].digest(hlen)
                 w.append("MD", tag, hlen)
                 w.close()
+    return filename
 
 
-def kat_auth(variant: ascon.AsconMacVariant = "Ascon-Mac") -> None:
+def kat_auth(variant: ascon.AsconMacVariant = "Ascon-Mac", shard: Shard = (0, 1), prefix: str = "") -> str:
     MAX_MESSAGE_LENGTH = 1024
     if variant == "Ascon-PrfShort": MAX_MESSAGE_LENGTH = 16
     klen = 16
@@ -108,31 +161,71 @@ def kat_auth(variant: ascon.AsconMacVariant = "Ascon-Mac") -> None:
 
     key = kat_bytes(klen)
     msg = kat_bytes(MAX_MESSAGE_LENGTH)
-    with MultipleWriter(filename) as w:
+    # Ascon-Mac/Prf: absorb msg once, finalize a copy at each length (PrfShort is a single permutation)
+    running = ascon.AsconMacStream(key, variant) if variant != "Ascon-PrfShort" else None
+    counts = shard_counts(MAX_MESSAGE_LENGTH+1, shard)
+    with MultipleWriter(prefix + filename) as w:
         count = 1
         for mlen in range(MAX_MESSAGE_LENGTH+1):
+            if running is not None and mlen > 0: running.update(msg[mlen-1:mlen])
+            if count not in counts:
+                count += 1
+                continue
             w.open()
             w.append("Count", count)
             count += 1
             w.append("Key", key, klen)
             w.append("Msg", msg, mlen)
-            tag = ascon.ascon_mac(key, msg[:mlen], variant, hlen)
+            if running is not None: tag = running.digest(hlen)
+            else: tag = ascon.ascon_mac(key, msg[:mlen], variant, hlen)
             w.append("Tag", tag, hlen)
             w.close()
-
-
-def kat(variant: ascon.AsconVariant) -> None:
+    return filename
+
+
+def kat_sharded(generate: Callable[..., str], args: tuple, jobs: int) -> str:
+    """
+    Run generate(*args, shard=(i, jobs), prefix=...) for all shards on a process
+    pool, then merge the shard files in Count order into the final KAT files.
+    The result is byte-identical to generate(*args).
+    """
+    with tempfile.TemporaryDirectory(prefix="genkat-") as tmpdir:
+        prefixes = [os.path.join(tmpdir, "shard{i}-".format(i=i)) for i in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(generate, *args, shard=(i, jobs), prefix=prefixes[i]) for i in range(jobs)]
+            filenames = [future.result() for future in futures]
+        filename = filenames[0]
+        merge_shards(filename, [shard_prefix + filename for shard_prefix in prefixes])
+    return filename
+
+
+def kat(variant: ascon.AsconVariant, max_message_length: int = 32, max_associated_data_length: int = 32, verify_every: int = 0, jobs: int = 1) -> None:
     aead_variants = ("Ascon-AEAD128",)
     hash_variants = ("Ascon-Hash256", "Ascon-XOF128", "Ascon-CXOF128")
     cxof_variants = ("Ascon-CXOF128",) # will produce two KATs (hash+cxof)
     auth_variants = ("Ascon-Mac", "Ascon-Prf", "Ascon-PrfShort")
     assert variant in aead_variants + hash_variants + cxof_variants + auth_variants
-    if variant in aead_variants: kat_aead(variant)
-    if variant in hash_variants: kat_hash(variant)
-    if variant in cxof_variants: kat_cxof(variant)
-    if variant in auth_variants: kat_auth(variant)
+    tasks: list[tuple[Callable[..., str], tuple]] = []
+    if variant in aead_variants: tasks.append((kat_aead, (variant, max_message_length, max_associated_data_length, verify_every)))
+    if variant in hash_variants: tasks.append((kat_hash, (variant,)))
+    if variant in cxof_variants: tasks.append((kat_cxof, (variant,)))
+    if variant in auth_variants: tasks.append((kat_auth, (variant,)))
+    for generate, args in tasks:
+        if jobs > 1: kat_sharded(generate, args, jobs)
+        else: generate(*args)
 
 
 if __name__ == "__main__":
-    variant = sys.argv[1] if len(sys.argv) > 1 else "Ascon-AEAD128"
-    kat(variant)
+    parser = argparse.ArgumentParser(description="Generate the NIST LWC known-answer test files for an Ascon variant")
+    parser.add_argument("variant", nargs="?", default="Ascon-AEAD128")
+    parser.add_argument("--max-msg", type=int, default=32,
+                        help="AEAD: largest plaintext length (default: 32, e.g. 256 for HW coverage)")
+    parser.add_argument("--max-ad", type=int, default=32,
+                        help="AEAD: largest associated data length (default: 32)")
+    parser.add_argument("--verify-every", type=int, default=0, metavar="N",
+                        help="AEAD: recompute and decrypt every N-th vector as a round-trip check (default: 0 = off)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="number of worker processes, each writing a shard of the Count range (default: 1, 0 = all cores)")
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    kat(args.variant, args.max_msg, args.max_ad, args.verify_every, jobs)
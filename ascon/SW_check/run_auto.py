@@ -218,33 +218,78 @@ class AsconTester:
             
             ciphertext = ascon.ascon_encrypt(key, nonce, ad, plaintext)
             
-            return {
-                "Count": count,
-                "Key": key.hex().upper(),
-                "Nonce": nonce.hex().upper(),
-                "PT": plaintext.hex().upper(),
-                "PT_len": pt_len,
-                "AD": ad.hex().upper(),
-                "AD_len": ad_len,
-                "CT": ciphertext.hex().upper(),
-                "CT_only": ciphertext[:-16].hex().upper(),
-                "Tag": ciphertext[-16:].hex().upper()
-            }
+            return self.aead_vector(count, key, nonce, ad, plaintext, ciphertext)
         
         elif test_type == "hash":
             msg_len = random.randint(0, 1024)
             message = bytes([random.randint(0, 255) for _ in range(msg_len)])
             hash_result = ascon.ascon_hash(message, "Ascon-Hash256", 32)
             
-            return {
-                "Count": count,
-                "Msg": message.hex().upper(),
-                "Msg_len": msg_len,
-                "Hash": hash_result.hex().upper()
-            }
+            return self.hash_vector(count, message, hash_result)
         
         return {}
     
+    def generate_test_vectors(self,
+                              test_type: str = "aead",
+                              n: int = 1,
+                              workers: Optional[int] = None) -> List[dict]:
+        """Generate n test vectors, computing all SW results in one multi-core batch"""
+        import random
+        import ascon_batch
+        
+        # Draw all inputs first (same random sequence as generate_test_vector)
+        if test_type == "aead":
+            jobs = []
+            for _ in range(n):
+                key = bytes([random.randint(0, 255) for _ in range(16)])
+                nonce = bytes([random.randint(0, 255) for _ in range(16)])
+                pt_len = random.randint(0, 32)
+                ad_len = random.randint(0, 32)
+                plaintext = bytes([random.randint(0, 255) for _ in range(pt_len)])
+                ad = bytes([random.randint(0, 255) for _ in range(ad_len)])
+                jobs.append((key, nonce, ad, plaintext))
+            
+            ciphertexts = ascon_batch.batch_encrypt(jobs, workers)
+            return [self.aead_vector(i+1, *job, ciphertext)
+                    for i, (job, ciphertext) in enumerate(zip(jobs, ciphertexts))]
+        
+        elif test_type == "hash":
+            messages = []
+            for _ in range(n):
+                msg_len = random.randint(0, 1024)
+                messages.append(bytes([random.randint(0, 255) for _ in range(msg_len)]))
+            
+            hashes = ascon_batch.batch_hash(messages, "Ascon-Hash256", 32, workers=workers)
+            return [self.hash_vector(i+1, message, hash_result)
+                    for i, (message, hash_result) in enumerate(zip(messages, hashes))]
+        
+        return []
+    
+    def aead_vector(self, count: int, key: bytes, nonce: bytes, ad: bytes,
+                    plaintext: bytes, ciphertext: bytes) -> dict:
+        """AEAD test vector in hardware-friendly format"""
+        return {
+            "Count": count,
+            "Key": key.hex().upper(),
+            "Nonce": nonce.hex().upper(),
+            "PT": plaintext.hex().upper(),
+            "PT_len": len(plaintext),
+            "AD": ad.hex().upper(),
+            "AD_len": len(ad),
+            "CT": ciphertext.hex().upper(),
+            "CT_only": ciphertext[:-16].hex().upper(),
+            "Tag": ciphertext[-16:].hex().upper()
+        }
+    
+    def hash_vector(self, count: int, message: bytes, hash_result: bytes) -> dict:
+        """Hash test vector in hardware-friendly format"""
+        return {
+            "Count": count,
+            "Msg": message.hex().upper(),
+            "Msg_len": len(message),
+            "Hash": hash_result.hex().upper()
+        }
+    
     def interactive_mode(self):
         """Interactive testing mode"""
         print("\n" + "="*60)
@@ -401,6 +446,7 @@ Examples:
   %(prog)s --compare SW_HEX HW_HEX         # Compare results
   %(prog)s --interactive                   # Interactive mode
   %(prog)s --generate 5 > test_vectors.json # Generate 5 test vectors
+  %(prog)s --generate 100000 --jobs 8      # Generate on 8 worker processes
         """
     )
     
@@ -433,6 +479,8 @@ Examples:
                        help="Generate N test vectors")
     parser.add_argument("--type", choices=["aead", "hash"], default="aead",
                        help="Type of test vectors to generate")
+    parser.add_argument("--jobs", type=int, default=None,
+                       help="Worker processes for --generate (default: all cores, in-process below 2048 vectors)")
     
     parser.add_argument("--interactive", "-i", action="store_true",
                        help="Interactive mode")
@@ -480,9 +528,7 @@ Examples:
         tester.compare_with_hardware(sw_result, args.compare[1])
     
     elif args.generate:
-        vectors = []
-        for i in range(args.generate):
-            vectors.append(tester.generate_test_vector(args.type, i+1))
+        vectors = tester.generate_test_vectors(args.type, args.generate, args.jobs)
         
         print(json.dumps(vectors, indent=2))
     
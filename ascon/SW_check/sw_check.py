@@ -2,6 +2,13 @@
 # ASCON Reference Model
 # =========================
 
+try:
+    import numpy as np   # optional: only for whole-sweep checks
+except ImportError:
+    np = None
+
+import ascon
+
 MASK64 = 0xFFFFFFFFFFFFFFFF
 
 # -------- Rotate Right --------
@@ -97,11 +104,48 @@ def ascon_round(x, r, verbose=True):
 
 # -------- ASCON Permutation --------
 def ascon_permutation(x, rounds=12, verbose=True):
+    # Sweep: x is an (N, 5) array -> run the same layers on whole columns
+    if np is not None and isinstance(x, np.ndarray) and x.ndim == 2:
+        cols = [x[:, i].astype(np.uint64) for i in range(5)]
+        for r in range(12 - rounds, 12):
+            cols = ascon_round(cols, r, verbose=False)
+        return np.stack(cols, axis=1)
+
     for r in range(12 - rounds, 12):
         x = ascon_round(x, r, verbose)
     return x
 
 
+# -------- Check a whole sweep against HW output --------
+def check_sweep(x_in, x_out, rounds=12):
+    x_in = np.asarray(x_in, dtype=np.uint64)
+    x_out = np.asarray(x_out, dtype=np.uint64)
+    ref = ascon_permutation(x_in, rounds, verbose=False)
+    # indices of the states where HW and reference disagree
+    return np.nonzero((ref != x_out).any(axis=1))[0]
+
+
+# -------- Check every layer against the ascon.py trace --------
+LAYERS = ("round constant addition", "substitution layer", "linear diffusion layer")
+
+def check_layers(x, rounds=12):
+    # round events of ascon.py: (layer, r, x0..x4) after each layer of each round
+    with ascon.AsconTraceBuffer(3 * rounds + 2, rounds=True) as trace:
+        ascon.ascon_permutation(list(x), rounds)
+    expected = {(phase, r): list(S) for phase, r, *S in trace.events()}
+
+    # returns the first (round, layer) where this model and ascon.py disagree, or None
+    x = list(x)
+    for r in range(12 - rounds, 12):
+        x = add_constant(x, r)
+        if x != expected[(LAYERS[0], r)]: return (r, LAYERS[0])
+        x = sbox_layer(x)
+        if x != expected[(LAYERS[1], r)]: return (r, LAYERS[1])
+        x = linear_diffusion(x)
+        if x != expected[(LAYERS[2], r)]: return (r, LAYERS[2])
+    return None
+
+
 # -------- Testbench --------
 def main():
     # Example test vector (easy for RTL debug)
@@ -116,11 +160,17 @@ def main():
     print("===== ASCON PERMUTATION TEST =====")
     print_state("Initial State", state)
 
-    out = ascon_permutation(state, rounds=12, verbose=True)
+    out = ascon_permutation(list(state), rounds=12, verbose=True)
 
     print("===== FINAL OUTPUT =====")
     print_state("Final State", out)
 
+    mismatch = check_layers(state, rounds=12)
+    if mismatch is None:
+        print("All layers match ascon.py")
+    else:
+        print(f"MISMATCH vs ascon.py at round {mismatch[0]}, {mismatch[1]}")
+
 
 if __name__ == "__main__":
     main()
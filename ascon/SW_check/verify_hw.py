@@ -24,19 +24,32 @@ Cách dùng:
   python verify_hw.py                   # sinh 10 random AEAD test case
   python verify_hw.py --mode aead --count 20
   python verify_hw.py --mode permutation --rounds 12
+  python verify_hw.py --mode permutation --sweep 1000000   # sweep lớn (NumPy)
   python verify_hw.py --mode all        # AEAD + permutation
   python verify_hw.py --fixed           # dùng input cố định (dễ debug RTL)
+  python verify_hw.py --count 1000000 --jobs 0             # song song, cùng kết quả
+  python verify_hw.py --count 1000000 --shard 0/4          # chia cho nhiều máy
+
+Mỗi test case AEAD có random riêng sinh từ (--seed, index), nên kết quả
+không phụ thuộc --jobs / --shard.
 """
 
 import argparse
 import random
 import sys
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
 
 # ── Import ascon từ cùng thư mục ──────────────────────────────────────────────
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 try:
     import ascon
+    import ascon_batch
+    import vector_cache
 except ImportError:
     print("[ERROR] Không tìm thấy ascon.py. Đặt verify_hw.py cùng thư mục với ascon.py")
     sys.exit(1)
@@ -45,24 +58,124 @@ except ImportError:
 #  HELPERS
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Số vector xử lý trong 1 lần gọi batch (encrypt / permutation). Pipeline chỉ
+# giữ 1 batch trong RAM nên bộ nhớ không tăng theo --count / --sweep.
+BATCH_SIZE = 1 << 14
+BUFFER_SIZE = 1 << 20  # buffer ghi file .tv
+
 def hex_or_zero(b: bytes) -> str:
     """Trả về hex string, hoặc '00' nếu rỗng (để TB không gặp field trống)."""
     return b.hex().upper() if b else "00"
 
-def rand_bytes(n: int) -> bytes:
-    return bytes([random.randint(0, 255) for _ in range(n)])
+def vector_rng(seed: int, case: int) -> random.Random:
+    """
+    Bộ sinh random riêng của test case thứ case (0-based), chỉ phụ thuộc
+    (seed, case): mỗi shard sinh đúng các vector như khi chạy tuần tự.
+    """
+    return random.Random(f"verify_hw:{seed}:{case}")
+
+def batched(iterable: Iterable, size: int = BATCH_SIZE) -> Iterator[list]:
+    """Chia iterable thành các list liên tiếp dài tối đa size phần tử."""
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+class AeadVector:
+    """1 test case AEAD (1 dòng trong file .tv). ct không gồm tag."""
+    __slots__ = ("count", "op", "key", "nonce", "pt", "ad", "ct", "tag")
+
+    def __init__(self, count: int, op: int, key: bytes, nonce: bytes,
+                 pt: bytes, ad: bytes, ct: bytes, tag: bytes):
+        self.count = count
+        self.op    = op      # 0 = encrypt, 1 = decrypt
+        self.key   = key
+        self.nonce = nonce
+        self.pt    = pt
+        self.ad    = ad
+        self.ct    = ct
+        self.tag   = tag
+
+
+# (COUNT, ROUNDS, X_IN, X_OUT) của 1 test case permutation
+PermVector = tuple[int, int, list[int], list[int]]
+
+# (index, số shard): shard (i, N) sinh phần thứ i trong N phần liên tiếp của các test case
+Shard = tuple[int, int]
+
+def parse_shard(text: str) -> Shard:
+    """Đọc tham số --shard dạng "i/N" với 0 <= i < N."""
+    try:
+        index, n = (int(x) for x in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard phải có dạng i/N, nhận được {text!r}")
+    if not 0 <= index < n:
+        raise argparse.ArgumentTypeError(f"shard {text!r}: cần 0 <= i < N")
+    return (index, n)
+
+def shard_cases(total: int, shard: Shard) -> range:
+    """Các test case (0-based) thuộc shard trong tổng số total test case."""
+    index, n = shard
+    return range(total * index // n, total * (index + 1) // n)
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  SINH VECTORS AEAD
 # ══════════════════════════════════════════════════════════════════════════════
 
-def gen_aead_vectors(count: int, fixed: bool = False) -> list[dict]:
+# Các combination pt_len x ad_len nhỏ để phủ edge-case (--fixed)
+FIXED_COMBOS = [
+    (0, 0), (0, 4), (0, 16),
+    (1, 0), (1, 8),
+    (8, 0), (8, 8), (8, 16),
+    (16, 0), (16, 16),
+    (20, 12), (32, 0), (32, 32),
+]
+
+# ── Coverage theo biên block (--coverage) ────────────────────────────────────
+#
+# RTL xử lý PT/AD theo block rate = 16 bytes, ghép từ 2 word 64-bit. Mỗi độ dài
+# thuộc 1 class = (số block đầy đủ: 0, 1, >= 2 = multi-block) x (phần dư:
+# rỗng, 1..7, đúng nửa block = 8, 9..15) → 12 class. Class multi-block gồm mọi
+# độ dài n*16 + dư với n trong MULTI_BLOCKS (block cuối không đầy đủ sau >= 2
+# block đầy đủ), phủ các độ dài 0..79 (< 128, data_len 7 bit của TB).
+
+AEAD_RATE = 16
+HALF_RATE = AEAD_RATE // 2
+MULTI_BLOCKS = range(2, 5)
+TAIL_CLASSES = ((0, 1), (1, HALF_RATE), (HALF_RATE, HALF_RATE + 1), (HALF_RATE + 1, AEAD_RATE))
+
+LENGTH_CLASSES = [tuple(AEAD_RATE * n + tail for n in blocks for tail in range(lo, hi))
+                  for blocks in (range(0, 1), range(1, 2), MULTI_BLOCKS)
+                  for lo, hi in TAIL_CLASSES]
+
+def length_class(n: int) -> int|None:
+    """Index của class chứa độ dài n trong LENGTH_CLASSES (None nếu n quá dài)."""
+    blocks, tail = divmod(n, AEAD_RATE)
+    if blocks >= MULTI_BLOCKS.stop: return None
+    return 4 * min(blocks, MULTI_BLOCKS.start) + (0 if tail == 0 else 1 if tail < HALF_RATE else 2 if tail == HALF_RATE else 3)
+
+def coverage_bins(coverage: str) -> list[tuple[Sequence[int], Sequence[int]]]:
     """
-    Trả về list các dict chứa đủ thông tin cho 1 test case AEAD.
-    fixed=True: dùng key/nonce/pt/ad cố định, chỉ thay đổi độ dài.
+    Tập (class PT, class AD) nhỏ nhất phủ mục tiêu coverage:
+      "off"    : không có
+      "classes": mỗi class của PT và của AD xuất hiện ít nhất 1 lần (12 vector)
+      "cross"  : mọi cặp class PT x class AD (144 vector)
     """
-    vectors = []
+    if coverage == "classes": return list(zip(LENGTH_CLASSES, LENGTH_CLASSES))
+    if coverage == "cross":   return [(pt, ad) for pt in LENGTH_CLASSES for ad in LENGTH_CLASSES]
+    return []
+
 
+def gen_aead_inputs(cases: Iterable[int], fixed: bool = False, seed: int = 42,
+                    bins: Sequence[tuple[Sequence[int], Sequence[int]]] | None = None) -> Iterator[ascon_batch.AeadJob]:
+    """
+    Sinh lần lượt input (key, nonce, ad, pt) cho các test case trong cases.
+    fixed=True: dùng key/nonce/pt/ad cố định, chỉ thay đổi độ dài.
+    fixed=False: test case thứ i dùng vector_rng(seed, i); i < len(bins) lấy
+    pt_len/ad_len ngẫu nhiên trong class bins[i], còn lại random fill
+    (bins=None: không có tập phủ, mọi case random fill).
+    """
+    bins = bins or ()
     if fixed:
         # Dùng pattern 0x00..FF dễ nhìn trên waveform
         key   = bytes(range(16))                        # 00 01 02 ... 0F
@@ -72,95 +185,79 @@ def gen_aead_vectors(count: int, fixed: bool = False) -> list[dict]:
                          0xEE, 0xFF, 0x11, 0x22,
                          0x33, 0x44, 0x55, 0x66,
                          0x77, 0x88, 0x99, 0x00])
-
-        # Tạo các combination pt_len x ad_len nhỏ để phủ edge-case
-        combos = [
-            (0, 0), (0, 4), (0, 16),
-            (1, 0), (1, 8),
-            (8, 0), (8, 8), (8, 16),
-            (16, 0), (16, 16),
-            (20, 12), (32, 0), (32, 32),
-        ]
-        # Giới hạn theo count
-        combos = combos[:count]
-        for idx, (pt_len, ad_len) in enumerate(combos):
-            pt = pt_pool[:pt_len]
-            ad = ad_pool[:ad_len]
-            ct_full = ascon.ascon_encrypt(key, nonce, ad, pt, "Ascon-AEAD128")
-            ct_only = ct_full[:-16]
-            tag     = ct_full[-16:]
-            vectors.append({
-                "count"  : idx + 1,
-                "mode"   : 0,
-                "op"     : 0,
-                "key"    : key,
-                "nonce"  : nonce,
-                "pt_len" : pt_len,
-                "pt"     : pt,
-                "ad_len" : ad_len,
-                "ad"     : ad,
-                "ct"     : ct_only,
-                "tag"    : tag,
-            })
+        for case in cases:
+            pt_len, ad_len = FIXED_COMBOS[case]
+            yield (key, nonce, ad_pool[:ad_len], pt_pool[:pt_len])
     else:
-        for idx in range(count):
-            key    = rand_bytes(16)
-            nonce  = rand_bytes(16)
-            pt_len = random.randint(0, 32)
-            ad_len = random.randint(0, 16)
-            pt     = rand_bytes(pt_len)
-            ad     = rand_bytes(ad_len)
-
-            ct_full = ascon.ascon_encrypt(key, nonce, ad, pt, "Ascon-AEAD128")
+        for case in cases:
+            rng    = vector_rng(seed, case)
+            if case < len(bins):
+                pt_len = rng.choice(bins[case][0])
+                ad_len = rng.choice(bins[case][1])
+            else:
+                pt_len = rng.randint(0, 32)
+                ad_len = rng.randint(0, 16)
+            # 1 lần gọi randbytes cho cả key || nonce || pt || ad
+            data   = rng.randbytes(32 + pt_len + ad_len)
+            yield (data[:16], data[16:32], data[32+pt_len:], data[32:32+pt_len])
+
+
+def gen_aead_vectors(count: int, fixed: bool = False, seed: int = 42, shard: Shard = (0, 1), coverage: str = "off") -> Iterator[AeadVector]:
+    """
+    Sinh lần lượt các test case AEAD theo thứ tự COUNT (generator, bộ nhớ không
+    phụ thuộc count). Input được encrypt theo từng batch BATCH_SIZE job
+    (ascon_encrypt_many); chạy song song bằng cách chia shard cho nhiều process.
+    fixed=True: dùng key/nonce/pt/ad cố định, chỉ thay đổi độ dài.
+    seed: seed gốc của các vector_rng (không dùng random global).
+    shard: chỉ sinh các test case của shard này, COUNT giữ nguyên như khi
+    chạy tuần tự nên nối các shard theo thứ tự sẽ ra đúng file đầy đủ.
+    coverage: các test case đầu là tập phủ coverage_bins(coverage) (luôn sinh đủ,
+    kể cả khi count nhỏ hơn), phần còn lại tới count là random fill.
+    """
+    bins  = coverage_bins(coverage)
+    total = min(count, len(FIXED_COMBOS)) if fixed else max(count, len(bins))
+    cases = shard_cases(total, shard)
+    # COUNT của vector đầu tiên trong shard (random: mỗi test case có 2 dòng ENC + DEC)
+    idx = cases.start if fixed else 2 * cases.start
+    for jobs in batched(gen_aead_inputs(cases, fixed, seed, bins)):
+        cts = ascon.ascon_encrypt_many(jobs)
+        for (key, nonce, ad, pt), ct_full in zip(jobs, cts):
             ct_only = ct_full[:-16]
             tag     = ct_full[-16:]
-
-            # Thêm 1 decrypt test ngay sau encrypt để TB tự verify round-trip
-            vectors.append({
-                "count"  : idx * 2 + 1,
-                "mode"   : 0,
-                "op"     : 0,      # encrypt
-                "key"    : key,
-                "nonce"  : nonce,
-                "pt_len" : pt_len,
-                "pt"     : pt,
-                "ad_len" : ad_len,
-                "ad"     : ad,
-                "ct"     : ct_only,
-                "tag"    : tag,
-            })
-            vectors.append({
-                "count"  : idx * 2 + 2,
-                "mode"   : 0,
-                "op"     : 1,      # decrypt (dùng ct+tag từ encrypt ở trên)
-                "key"    : key,
-                "nonce"  : nonce,
-                "pt_len" : pt_len,
-                "pt"     : pt,     # expected plaintext (TB so sánh output HW)
-                "ad_len" : ad_len,
-                "ad"     : ad,
-                "ct"     : ct_only,
-                "tag"    : tag,
-            })
-
-    return vectors
+            if fixed:
+                idx += 1
+                yield AeadVector(idx, 0, key, nonce, pt, ad, ct_only, tag)
+            else:
+                # Thêm 1 decrypt test ngay sau encrypt để TB tự verify round-trip
+                # (TB so sánh output HW với pt = expected plaintext)
+                yield AeadVector(idx + 1, 0, key, nonce, pt, ad, ct_only, tag)
+                yield AeadVector(idx + 2, 1, key, nonce, pt, ad, ct_only, tag)
+                idx += 2
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  SINH VECTORS PERMUTATION
 # ══════════════════════════════════════════════════════════════════════════════
 
-def gen_permutation_vectors(rounds_list: list[int] = [12, 8, 6],
-                            fixed: bool = False) -> list[dict]:
+def permute_states(states: list[list[int]], rounds: int) -> list[list[int]]:
     """
-    Sinh test vector cho permutation-only test.
-    Format khác AEAD: chỉ có X0..X4 in và X0..X4 out.
+    Chạy permutation cho cả batch trong 1 lần gọi, trên backend đang active
+    của ascon.py (NumPy nếu có, ngược lại lane-packed pure Python;
+    ASCON_BACKEND=reference để ép dùng bản tham chiếu).
     """
-    import copy
+    return ascon.ascon_permute_many(states, rounds)
 
-    vectors = []
-    idx = 1
 
+def gen_permutation_vectors(rounds_list: list[int] = [12, 8, 6],
+                            fixed: bool = False,
+                            sweep: int = 0) -> Iterator[PermVector]:
+    """
+    Sinh lần lượt test vector cho permutation-only test (generator).
+    Format khác AEAD: chỉ có X0..X4 in và X0..X4 out.
+    sweep: số state random thêm vào (sweep lớn cho HW permutation).
+    Các state sweep không được lưu lại: mỗi giá trị rounds sinh lại chúng
+    từ cùng trạng thái random, theo từng batch BATCH_SIZE state.
+    """
     state_patterns = [
         [0x0000000000000000] * 5,                                    # all zero
         [0x1111111111111111,0x2222222222222222,0x3333333333333333,
@@ -176,28 +273,100 @@ def gen_permutation_vectors(rounds_list: list[int] = [12, 8, 6],
         for _ in range(3):
             state_patterns.append([random.randint(0, 0xFFFFFFFFFFFFFFFF) for _ in range(5)])
 
-    for rounds in rounds_list:
-        for state_in in state_patterns:
-            state = list(state_in)          # copy vì ascon_permutation mutate in-place
-            ascon.ascon_permutation(state, rounds)
-            vectors.append({
-                "count"    : idx,
-                "rounds"   : rounds,
-                "x_in"     : list(state_in),
-                "x_out"    : list(state),
-            })
-            idx += 1
+    def sweep_states() -> Iterator[list[int]]:
+        yield from state_patterns
+        for _ in range(sweep):
+            yield [random.getrandbits(64) for _ in range(5)]
 
-    return vectors
+    sweep_start = random.getstate()
+    idx = 1
+    for rounds in rounds_list:
+        random.setstate(sweep_start)
+        for states_in in batched(sweep_states()):
+            for state_in, state_out in zip(states_in, permute_states(states_in, rounds)):
+                yield (idx, rounds, state_in, state_out)
+                idx += 1
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  GHI FILE .tv
 # ══════════════════════════════════════════════════════════════════════════════
 
-def write_aead_tv(vectors: list[dict], filepath: str):
+# Phần comment đầu file AEAD .tv
+AEAD_TV_HEADER = (
+    "# ============================================================\n"
+    "# ASCON-AEAD128 Test Vectors - generated by verify_hw.py\n"
+    "# SW reference: ascon.py (NIST SP 800-232)\n"
+    "#\n"
+    "# COLUMNS:\n"
+    "#   COUNT  : test case index (decimal)\n"
+    "#   MODE   : 0=Ascon-AEAD128\n"
+    "#   OP     : 0=encrypt  1=decrypt\n"
+    "#   KEY    : 128-bit key (32 hex chars)\n"
+    "#   NONCE  : 128-bit nonce (32 hex chars)\n"
+    "#   PT_LEN : plaintext length in bytes (decimal)\n"
+    "#   PT_HEX : plaintext hex (PT_LEN*2 chars, '00' if empty)\n"
+    "#   AD_LEN : associated data length in bytes (decimal)\n"
+    "#   AD_HEX : associated data hex ('00' if empty)\n"
+    "#   CT_HEX : ciphertext hex without tag ('00' if empty)\n"
+    "#   TAG_HEX: 128-bit authentication tag (32 hex chars)\n"
+    "# ============================================================\n"
+    "#\n"
+)
+
+
+class AeadSummary:
+    """Thống kê chạy dần trong lúc ghi file (không giữ lại vectors)."""
+    __slots__ = ("total", "enc", "dec", "head", "bins")
+
+    def __init__(self):
+        self.total = 0
+        self.enc   = 0
+        self.dec   = 0
+        self.head: list[AeadVector] = []   # 2 vector đầu để in ra màn hình
+        self.bins: set[tuple[int, int]] = set()  # các cặp (class PT, class AD) đã phủ
+
+    def add(self, v: AeadVector):
+        self.total += 1
+        if v.op == 0: self.enc += 1
+        else:         self.dec += 1
+        if len(self.head) < 2: self.head.append(v)
+        pt_class, ad_class = length_class(len(v.pt)), length_class(len(v.ad))
+        if pt_class is not None and ad_class is not None:
+            self.bins.add((pt_class, ad_class))
+
+    def merge(self, other: "AeadSummary"):
+        """Cộng summary của shard kế tiếp (theo thứ tự COUNT) vào summary này."""
+        self.total += other.total
+        self.enc   += other.enc
+        self.dec   += other.dec
+        self.head  += other.head[:2 - len(self.head)]
+        self.bins  |= other.bins
+
+    def to_json(self) -> dict:
+        """Dạng JSON để lưu trong vector_cache."""
+        return {"total": self.total, "enc": self.enc, "dec": self.dec,
+                "head": [[v.count, v.op] + [getattr(v, k).hex() for k in AeadVector.__slots__[2:]]
+                         for v in self.head],
+                "bins": sorted(self.bins)}
+
+    @classmethod
+    def from_json(cls, d: dict) -> "AeadSummary":
+        summary = cls()
+        summary.total, summary.enc, summary.dec = d["total"], d["enc"], d["dec"]
+        summary.head = [AeadVector(count, op, *(bytes.fromhex(x) for x in fields))
+                        for count, op, *fields in d["head"]]
+        summary.bins = {tuple(b) for b in d["bins"]}
+        return summary
+
+
+def write_aead_tv(vectors: Iterable[AeadVector], filepath: str, header: bool = True,
+                  mem: "AeadMemWriter|None" = None) -> AeadSummary:
     """
-    Ghi file test vector AEAD cho Verilog TB.
+    Ghi file test vector AEAD cho Verilog TB, vừa sinh vừa ghi
+    (vectors có thể là generator). Trả về summary để in ra màn hình.
+    header=False: bỏ phần comment đầu file (shard thứ 2 trở đi).
+    mem: nếu có, ghi thêm từng vector vào memory image $readmemh.
 
     Format:
       # comment
@@ -205,52 +374,188 @@ def write_aead_tv(vectors: list[dict], filepath: str):
 
     TB đọc bằng $fscanf với format string tương ứng.
     """
-    with open(filepath, "w") as f:
-        f.write("# ============================================================\n")
-        f.write("# ASCON-AEAD128 Test Vectors - generated by verify_hw.py\n")
-        f.write("# SW reference: ascon.py (NIST SP 800-232)\n")
-        f.write("#\n")
-        f.write("# COLUMNS:\n")
-        f.write("#   COUNT  : test case index (decimal)\n")
-        f.write("#   MODE   : 0=Ascon-AEAD128\n")
-        f.write("#   OP     : 0=encrypt  1=decrypt\n")
-        f.write("#   KEY    : 128-bit key (32 hex chars)\n")
-        f.write("#   NONCE  : 128-bit nonce (32 hex chars)\n")
-        f.write("#   PT_LEN : plaintext length in bytes (decimal)\n")
-        f.write("#   PT_HEX : plaintext hex (PT_LEN*2 chars, '00' if empty)\n")
-        f.write("#   AD_LEN : associated data length in bytes (decimal)\n")
-        f.write("#   AD_HEX : associated data hex ('00' if empty)\n")
-        f.write("#   CT_HEX : ciphertext hex without tag ('00' if empty)\n")
-        f.write("#   TAG_HEX: 128-bit authentication tag (32 hex chars)\n")
-        f.write("# ============================================================\n")
-        f.write("#\n")
+    summary = AeadSummary()
+    with open(filepath, "w", buffering=BUFFER_SIZE) as f:
+        if header: f.write(AEAD_TV_HEADER)
 
         for v in vectors:
+            summary.add(v)
+            if mem is not None: mem.add(v)
             f.write(
-                f"{v['count']} "
-                f"{v['mode']} "
-                f"{v['op']} "
-                f"{v['key'].hex().upper()} "
-                f"{v['nonce'].hex().upper()} "
-                f"{v['pt_len']} "
-                f"{hex_or_zero(v['pt'])} "
-                f"{v['ad_len']} "
-                f"{hex_or_zero(v['ad'])} "
-                f"{hex_or_zero(v['ct'])} "
-                f"{v['tag'].hex().upper()}\n"
+                f"{v.count} "
+                f"0 "                       # MODE: Ascon-AEAD128
+                f"{v.op} "
+                f"{v.key.hex().upper()} "
+                f"{v.nonce.hex().upper()} "
+                f"{len(v.pt)} "
+                f"{hex_or_zero(v.pt)} "
+                f"{len(v.ad)} "
+                f"{hex_or_zero(v.ad)} "
+                f"{hex_or_zero(v.ct)} "
+                f"{v.tag.hex().upper()}\n"
             )
 
-    print(f"[OK] Đã ghi {len(vectors)} AEAD vectors → {filepath}")
+    return summary
+
+
+# ── Memory image cho $readmemh ───────────────────────────────────────────────
+#
+# Thay vì parse .tv bằng $fscanf, TB có thể nạp 2 file bằng $readmemh:
+#   reg [127:0] vec_mem [0:DEPTH-1];  $readmemh("..._data.mem",  vec_mem);
+#   reg [127:0] idx_mem [0:N-1];      $readmemh("..._index.mem", idx_mem);
+# Mọi dòng là đúng 1 word 128-bit (32 hex chars), byte đầu tiên ở MSB
+# (giống key_in = 128'h0001..0F trong TB).
 
+MEM_WORD_BYTES = 16     # = rate của Ascon-AEAD128 = độ rộng data_in của core
 
-def write_permutation_tv(vectors: list[dict], filepath: str):
+MEM_DATA_HEADER = (
+    "// ASCON-AEAD128 vector data image ($readmemh, 128-bit words) - generated by verify_hw.py\n"
+    "// Mỗi vector bắt đầu tại OFFSET (xem _index.mem), các phần nối tiếp nhau:\n"
+    "//   KEY (1 word) | NONCE (1 word) | AD (ceil(AD_LEN/16) words) |\n"
+    "//   PT (ceil(PT_LEN/16) words) | CT (ceil(PT_LEN/16) words) | TAG (1 word)\n"
+    "// Block cuối của AD/PT/CT được pad 0 bên phải (byte thấp).\n"
+)
+
+MEM_INDEX_HEADER = (
+    "// ASCON-AEAD128 vector index image ($readmemh, 128-bit words) - generated by verify_hw.py\n"
+    "// 1 word / vector, theo thứ tự COUNT:\n"
+    "//   [127:96] COUNT   [95:64] OFFSET (word address trong _data.mem)\n"
+    "//   [63:48] PT_LEN   [47:32] AD_LEN (bytes)   [7:4] MODE   [3:0] OP\n"
+    "// Vector DEC dùng chung OFFSET với vector ENC ngay trước nó.\n"
+)
+
+def mem_paths(filepath: str) -> tuple[str, str]:
+    """Tên 2 memory image đi kèm file .tv: (<tên>_data.mem, <tên>_index.mem)."""
+    base = os.path.splitext(filepath)[0]
+    return (base + "_data.mem", base + "_index.mem")
+
+def mem_words(b: bytes) -> str:
+    """b pad 0 tới bội số 16 bytes, 1 dòng hex / word ("" nếu b rỗng)."""
+    h = b.hex().upper()
+    h += "0" * (-len(h) % (2 * MEM_WORD_BYTES))
+    return "".join(h[i:i+32] + "\n" for i in range(0, len(h), 32))
+
+
+class AeadMemWriter:
+    """
+    Ghi memory image data + index cho các AeadVector, vừa sinh vừa ghi.
+    header=False: không ghi comment đầu file (file shard, được nối lại sau).
     """
-    Ghi file test vector permutation cho Verilog TB.
+
+    def __init__(self, data_path: str, index_path: str, header: bool = True):
+        self.data  = open(data_path, "w", buffering=BUFFER_SIZE)
+        self.index = open(index_path, "w", buffering=BUFFER_SIZE)
+        if header:
+            self.data.write(MEM_DATA_HEADER)
+            self.index.write(MEM_INDEX_HEADER)
+        self.words = 0         # số word đã ghi vào data image
+        self.last  = None      # (key, nonce, ad, pt, ct, tag) của vector trước
+        self.last_offset = 0
+
+    def add(self, v: AeadVector):
+        record = (v.key, v.nonce, v.ad, v.pt, v.ct, v.tag)
+        if record != self.last:
+            self.last, self.last_offset = record, self.words
+            block = (mem_words(v.key) + mem_words(v.nonce) + mem_words(v.ad) +
+                     mem_words(v.pt) + mem_words(v.ct) + mem_words(v.tag))
+            self.data.write(block)
+            self.words += len(block) // (2 * MEM_WORD_BYTES + 1)
+        assert len(v.pt) < 1 << 16 and len(v.ad) < 1 << 16
+        self.index.write(f"{v.count:08X}{self.last_offset:08X}"
+                         f"{len(v.pt):04X}{len(v.ad):04X}000000{0:X}{v.op:X}\n")
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self) -> "AeadMemWriter":
+        return self
+
+    def __exit__(self, *exc_info: object):
+        self.close()
+
+
+def merge_mem_shards(data_path: str, index_path: str, shards: list[tuple[str, str]]):
+    """
+    Nối các memory image của shard theo thứ tự, cộng OFFSET trong index với
+    số word data của các shard trước. Chỉ các dòng word được đếm và chép,
+    dòng trống / comment "//" của shard bị bỏ qua.
+    """
+    base = 0
+    with open(data_path, "w", buffering=BUFFER_SIZE) as data, \
+         open(index_path, "w", buffering=BUFFER_SIZE) as index:
+        data.write(MEM_DATA_HEADER)
+        index.write(MEM_INDEX_HEADER)
+        for shard_data, shard_index in shards:
+            words = 0
+            with open(shard_data) as f:
+                for line in f:
+                    word = line.strip()
+                    if word and not word.startswith("//"):
+                        data.write(word + "\n")
+                        words += 1
+            with open(shard_index) as f:
+                for line in f:
+                    word = line.strip()
+                    if word and not word.startswith("//"):
+                        index.write(f"{word[:8]}{int(word[8:16], 16) + base:08X}{word[16:]}\n")
+            base += words
+
+
+def write_aead_shard(count: int, fixed: bool, seed: int, shard: Shard, filepath: str,
+                     mem: tuple[str, str]|None = None, coverage: str = "off") -> AeadSummary:
+    """
+    Sinh và ghi các test case AEAD của 1 shard (chạy trong worker process).
+    Chỉ shard 0 có header, nên nối các file shard theo thứ tự (cat) sẽ ra
+    file giống hệt bản chạy tuần tự.
+    mem: (data_path, index_path) để ghi thêm memory image của shard (không
+    header, OFFSET tính từ đầu shard; xem merge_mem_shards).
+    coverage: xem gen_aead_vectors.
+    """
+    vectors = gen_aead_vectors(count, fixed=fixed, seed=seed, shard=shard, coverage=coverage)
+    if mem is None:
+        return write_aead_tv(vectors, filepath, header=shard[0] == 0)
+    with AeadMemWriter(*mem, header=False) as mem_writer:
+        return write_aead_tv(vectors, filepath, header=shard[0] == 0, mem=mem_writer)
+
+
+def write_aead_parallel(count: int, fixed: bool, seed: int, jobs: int, filepath: str,
+                        mem: bool = False, coverage: str = "off") -> AeadSummary:
+    """
+    Chia các test case thành jobs shard, sinh song song trên process pool
+    rồi nối các file shard theo thứ tự COUNT vào filepath.
+    mem=True: ghi thêm memory image mem_paths(filepath).
+    """
+    with tempfile.TemporaryDirectory(prefix="verify_hw-") as tmpdir:
+        paths = [os.path.join(tmpdir, f"shard{i}.tv") for i in range(jobs)]
+        shard_mems = [mem_paths(path) if mem else None for path in paths]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(write_aead_shard, count, fixed, seed, (i, jobs), paths[i], shard_mems[i],
+                                   coverage)
+                       for i in range(jobs)]
+            summaries = [future.result() for future in futures]
+        with open(filepath, "wb") as out:
+            for path in paths:
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out, BUFFER_SIZE)
+        if mem:
+            merge_mem_shards(*mem_paths(filepath), shard_mems)
+    summary = summaries[0]
+    for other in summaries[1:]:
+        summary.merge(other)
+    return summary
+
+
+def write_permutation_tv(vectors: Iterable[PermVector], filepath: str) -> int:
+    """
+    Ghi file test vector permutation cho Verilog TB, vừa sinh vừa ghi.
+    Trả về số vector đã ghi.
 
     Format:
       COUNT ROUNDS X0_IN X1_IN X2_IN X3_IN X4_IN X0_OUT X1_OUT X2_OUT X3_OUT X4_OUT
     """
-    with open(filepath, "w") as f:
+    total = 0
+    with open(filepath, "w", buffering=BUFFER_SIZE) as f:
         f.write("# ============================================================\n")
         f.write("# ASCON Permutation Test Vectors - generated by verify_hw.py\n")
         f.write("#\n")
@@ -262,37 +567,42 @@ def write_permutation_tv(vectors: list[dict], filepath: str):
         f.write("# ============================================================\n")
         f.write("#\n")
 
-        for v in vectors:
-            xi = " ".join(f"{x:016X}" for x in v["x_in"])
-            xo = " ".join(f"{x:016X}" for x in v["x_out"])
-            f.write(f"{v['count']} {v['rounds']} {xi} {xo}\n")
+        for count, rounds, x_in, x_out in vectors:
+            xi = " ".join(f"{x:016X}" for x in x_in)
+            xo = " ".join(f"{x:016X}" for x in x_out)
+            f.write(f"{count} {rounds} {xi} {xo}\n")
+            total += 1
 
-    print(f"[OK] Đã ghi {len(vectors)} permutation vectors → {filepath}")
+    return total
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  IN SUMMARY ra màn hình
 # ══════════════════════════════════════════════════════════════════════════════
 
-def print_summary_aead(vectors: list[dict]):
+def print_summary_aead(summary: AeadSummary, coverage: str = "off"):
+    """In summary; dòng Coverage chỉ in khi bật --coverage."""
     print("\n── AEAD Test Vector Summary ─────────────────────────────────────")
-    print(f"  Total vectors : {len(vectors)}")
-    enc = sum(1 for v in vectors if v['op'] == 0)
-    dec = sum(1 for v in vectors if v['op'] == 1)
-    print(f"  Encrypt       : {enc}")
-    print(f"  Decrypt       : {dec}")
+    print(f"  Total vectors : {summary.total}")
+    print(f"  Encrypt       : {summary.enc}")
+    print(f"  Decrypt       : {summary.dec}")
+    n = len(LENGTH_CLASSES)
+    if coverage != "off":
+        print(f"  Coverage      : PT {len({pt for pt, _ in summary.bins})}/{n} class, "
+              f"AD {len({ad for _, ad in summary.bins})}/{n} class, "
+              f"PT x AD {len(summary.bins)}/{n * n}")
     # In 2 vector đầu để người dùng check nhanh
-    for v in vectors[:2]:
-        op_str = "ENC" if v['op'] == 0 else "DEC"
-        print(f"\n  [{v['count']}] {op_str}")
-        print(f"    KEY   : {v['key'].hex().upper()}")
-        print(f"    NONCE : {v['nonce'].hex().upper()}")
-        print(f"    PT    : {hex_or_zero(v['pt'])} (len={v['pt_len']})")
-        print(f"    AD    : {hex_or_zero(v['ad'])} (len={v['ad_len']})")
-        print(f"    CT    : {hex_or_zero(v['ct'])}")
-        print(f"    TAG   : {v['tag'].hex().upper()}")
-    if len(vectors) > 2:
-        print(f"\n  ... và {len(vectors)-2} vectors nữa trong file.")
+    for v in summary.head:
+        op_str = "ENC" if v.op == 0 else "DEC"
+        print(f"\n  [{v.count}] {op_str}")
+        print(f"    KEY   : {v.key.hex().upper()}")
+        print(f"    NONCE : {v.nonce.hex().upper()}")
+        print(f"    PT    : {hex_or_zero(v.pt)} (len={len(v.pt)})")
+        print(f"    AD    : {hex_or_zero(v.ad)} (len={len(v.ad)})")
+        print(f"    CT    : {hex_or_zero(v.ct)}")
+        print(f"    TAG   : {v.tag.hex().upper()}")
+    if summary.total > 2:
+        print(f"\n  ... và {summary.total-2} vectors nữa trong file.")
     print("─────────────────────────────────────────────────────────────────\n")
 
 
@@ -311,8 +621,15 @@ Ví dụ:
   python verify_hw.py --fixed                  # AEAD vectors cố định (dễ debug)
   python verify_hw.py --mode permutation       # Permutation vectors (rounds 6,8,12)
   python verify_hw.py --mode permutation --rounds 12
+  python verify_hw.py --mode permutation --sweep 100000   # Sweep lớn
   python verify_hw.py --mode all --count 10    # Cả AEAD + permutation
+  python verify_hw.py --count 100000 --jobs 0  # Sinh song song trên mọi core (file giống hệt --jobs 1)
+  python verify_hw.py --count 100000 --shard 1/4 --out part1.tv
+                                               # Phần 2/4 (cat part0.tv .. part3.tv = file đầy đủ)
   python verify_hw.py --out my_vectors.tv      # Đổi tên file output
+  python verify_hw.py --coverage cross --count 200    # 144 test case phủ biên block + 56 random
+  python verify_hw.py --count 100000 --mem     # Thêm ascon_aead_vectors_data.mem/_index.mem ($readmemh)
+  python verify_hw.py --count 100000 --cache ~/.cache/ascon_vectors   # Lần sau lấy lại từ cache
         """
     )
     parser.add_argument("--mode", choices=["aead", "permutation", "all"],
@@ -327,22 +644,91 @@ Ví dụ:
                         help="Tên file output (default: ascon_aead_vectors.tv hoặc ascon_perm_vectors.tv)")
     parser.add_argument("--seed", type=int, default=42,
                         help="Random seed để kết quả tái tạo được (default: 42)")
+    parser.add_argument("--sweep", type=int, default=0,
+                        help="Số state random thêm vào permutation test (default: 0)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Số process sinh AEAD vectors song song, mỗi process 1 shard (default: 1, 0 = tất cả core)")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                        help="Chỉ sinh phần thứ i (0-based) trong N phần AEAD vectors; "
+                             "chỉ shard 0 có header, nối các phần theo thứ tự ra file đầy đủ")
+    parser.add_argument("--coverage", choices=["off", "classes", "cross"], default="off",
+                        help="Mở đầu bằng tập vector nhỏ nhất phủ các class độ dài PT/AD theo biên block "
+                             "(rỗng, 1-7, 8, 9-15 bytes dư x 0/1/2+ block đầy đủ): classes = mỗi class "
+                             "PT và AD (12 test case), cross = mọi cặp PT x AD (144); phần còn lại tới "
+                             "--count là random (default: off)")
+    parser.add_argument("--mem", action="store_true",
+                        help="Ghi thêm memory image AEAD cho $readmemh: <out>_data.mem (word 128-bit, "
+                             "căn theo word) và <out>_index.mem (COUNT, OFFSET, PT_LEN, AD_LEN, OP)")
+    parser.add_argument("--cache", type=str, default=None, metavar="DIR",
+                        help="Thư mục cache vector (default: $ASCON_VECTOR_CACHE, không đặt = tắt cache); "
+                             "cùng tham số + cùng ascon.py thì chỉ hardlink/copy file từ cache")
+    parser.add_argument("--cache-size", type=int, default=None, metavar="MB",
+                        help="Giới hạn dung lượng cache, xoá entry dùng lâu nhất trước "
+                             "(default: $ASCON_VECTOR_CACHE_SIZE hoặc 1024)")
 
     args = parser.parse_args()
+    if args.shard is not None and args.mode != "aead":
+        parser.error("--shard chỉ dùng được với --mode aead")
+    if args.fixed and args.coverage != "off":
+        parser.error("--coverage dùng input random, không dùng chung với --fixed")
+    if args.shard is not None and args.mem:
+        parser.error("--mem cần OFFSET trên toàn bộ file, dùng --jobs thay cho --shard")
+    # random global chỉ còn dùng cho permutation; AEAD dùng vector_rng(seed, case)
     random.seed(args.seed)
 
+    # Cache: key = tham số sinh vector + source của ascon.py và các script sinh
+    # (--jobs không đổi kết quả nên không nằm trong key)
+    cache = vector_cache.VectorCache.from_env(args.cache, args.cache_size)
+    sources = (ascon.__file__, ascon_batch.__file__, __file__)
+
     if args.mode in ("aead", "all"):
-        vectors = gen_aead_vectors(args.count, fixed=args.fixed)
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
         out_path = args.out if args.out else "ascon_aead_vectors.tv"
-        write_aead_tv(vectors, out_path)
-        print_summary_aead(vectors)
+        files = {"aead.tv": out_path}
+        if args.mem: files["data.mem"], files["index.mem"] = mem_paths(out_path)
+
+        def generate_aead() -> dict:
+            if args.shard is not None:
+                summary = write_aead_shard(args.count, args.fixed, args.seed, args.shard, out_path,
+                                           coverage=args.coverage)
+            elif jobs > 1:
+                summary = write_aead_parallel(args.count, args.fixed, args.seed, jobs, out_path, args.mem,
+                                              args.coverage)
+            elif args.mem:
+                vectors = gen_aead_vectors(args.count, fixed=args.fixed, seed=args.seed,
+                                           coverage=args.coverage)
+                with AeadMemWriter(*mem_paths(out_path)) as mem_writer:
+                    summary = write_aead_tv(vectors, out_path, mem=mem_writer)
+            else:
+                vectors = gen_aead_vectors(args.count, fixed=args.fixed, seed=args.seed,
+                                           coverage=args.coverage)
+                summary = write_aead_tv(vectors, out_path)
+            return summary.to_json()
+
+        key = vector_cache.cache_key({"mode": "aead", "count": args.count, "fixed": args.fixed, "seed": args.seed,
+                                      "shard": args.shard, "mem": args.mem, "coverage": args.coverage}, *sources)
+        summary_json, hit = vector_cache.cached(cache, key, files, generate_aead)
+        summary = AeadSummary.from_json(summary_json)
+        from_cache = " (cache)" if hit else ""
+        print(f"[OK] Đã ghi {summary.total} AEAD vectors → {out_path}{from_cache}")
+        if args.mem:
+            print(f"[OK] Đã ghi memory image → {', '.join(mem_paths(out_path))}{from_cache}")
+        print_summary_aead(summary, args.coverage)
 
     if args.mode in ("permutation", "all"):
         rounds_list = [args.rounds] if args.rounds else [6, 8, 12]
-        perm_vectors = gen_permutation_vectors(rounds_list, fixed=args.fixed)
         perm_out = ("ascon_perm_vectors.tv" if args.out is None
                     else args.out.replace(".tv", "_perm.tv"))
-        write_permutation_tv(perm_vectors, perm_out)
+
+        def generate_perm() -> int:
+            perm_vectors = gen_permutation_vectors(rounds_list, fixed=args.fixed,
+                                                   sweep=args.sweep)
+            return write_permutation_tv(perm_vectors, perm_out)
+
+        key = vector_cache.cache_key({"mode": "permutation", "rounds": rounds_list, "fixed": args.fixed,
+                                      "seed": args.seed, "sweep": args.sweep}, *sources)
+        total, hit = vector_cache.cached(cache, key, {"perm.tv": perm_out}, generate_perm)
+        print(f"[OK] Đã ghi {total} permutation vectors → {perm_out}{' (cache)' if hit else ''}")
 
 
 if __name__ == "__main__":
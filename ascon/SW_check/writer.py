@@ -9,6 +9,51 @@ from typing import Type, Optional, Self, overload, override
 from types import TracebackType
 from abc import ABC, abstractmethod
 
+BUFFER_SIZE = 1 << 20  # characters collected before each write to the file
+
+# an encoded field: (label, value, quoted), value is upper-case hex for bytes
+# (quoted in JSON) or the decimal representation for int (not quoted)
+Field = tuple[str, str, bool]
+
+def encode_field(label: str, value: bytes|int, length: Optional[int] = None) -> Field:
+    """
+    Encode a value once, for all output formats.
+    """
+    if length is not None:
+        assert isinstance(value, (bytes, bytearray)), "length can only be specified for value of type bytes"
+        assert len(value) >= length
+        return (label, value[:length].hex().upper(), True)
+    assert isinstance(value, int)
+    return (label, str(value), False)
+
+
+class BufferedFile:
+    """
+    Output file collecting small writes into large chunks.
+    """
+
+    def __init__(self, filename: str, buffer_size: int = BUFFER_SIZE) -> None:
+        self.fp = open(filename, "w")
+        self.buffer_size = buffer_size
+        self.chunks: list[str] = []
+        self.size = 0
+
+    def write(self, text: str) -> None:
+        self.chunks.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.fp.write("".join(self.chunks))
+        self.chunks.clear()
+        self.size = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.fp.close()
+
+
 class GenericWriter(ABC):
     """
     GenericWriter used as a base class for all writers for better typing.
@@ -41,14 +86,23 @@ class GenericWriter(ABC):
     def close(self) -> None:
         pass
 
+    @abstractmethod
+    def write_record(self, fields: list[Field]) -> None:
+        """
+        Write one complete record of already encoded fields (see encode_field).
+        """
+        pass
+
+
 class TextWriter(GenericWriter):
     """
     TextWriter produces an array of key-value objects.
     """
 
     def __init__(self, filename: str) -> None:
-        self.fp = open(filename + ".txt", "w")
+        self.fp = BufferedFile(filename + ".txt")
         self.is_open = False
+        self.fields: list[Field] = []
 
     def __enter__(self) -> Self:
         return self
@@ -62,15 +116,7 @@ class TextWriter(GenericWriter):
     def append(self, label: str, value: int, length: None = None) -> None: ...
     def append(self, label: str, value: bytes|int, length: Optional[int] = None) -> None:
         assert self.is_open, "cannot append if not open yet"
-        if length is not None:
-            assert isinstance(value, bytes), "length can only be specified for value of type bytes"
-            assert len(value) >= length
-            value_fmt = value[:length].hex().upper()
-        else:
-            assert isinstance(value, int)
-            value_fmt = f"{value}"
-
-        self.fp.write("{} = {}\n".format(label, value_fmt))
+        self.fields.append(encode_field(label, value, length))
 
     def open(self) -> None:
         assert not self.is_open, "cannot open twice"
@@ -78,9 +124,14 @@ class TextWriter(GenericWriter):
 
     def close(self) -> None:
         assert self.is_open, "cannot close if not open first"
-        self.fp.write("\n")
+        self.write_record(self.fields)
+        self.fields = []
         self.is_open = False
 
+    @override
+    def write_record(self, fields: list[Field]) -> None:
+        self.fp.write("".join([f"{label} = {value}\n" for label, value, _ in fields]) + "\n")
+
 
 class JSONWriter(GenericWriter):
     """
@@ -88,21 +139,18 @@ class JSONWriter(GenericWriter):
     """
 
     def __init__(self, filename: str) -> None:
-        self.level = 1
-        self.fp = open(filename + ".json", "w")
+        self.fp = BufferedFile(filename + ".json")
+        self.is_open = False
         self.has_item = False
         self.tab = " " * 2
-        self.comma = lambda: "," * self.has_item
-        self.ws = lambda: "\n" * \
-            (self.level > 0 or self.has_item) + self.tab * self.level
+        self.fields: list[Field] = []
         self.fp.write("[")
 
     def __enter__(self) -> Self:
         return self
 
     def __exit__(self, stype: Optional[Type[BaseException]], value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
-        self.level -= 1
-        self.fp.write("{}]\n".format(self.ws()))
+        self.fp.write("\n]\n" if self.has_item else "]\n")
         self.fp.close()
 
     @overload
@@ -112,37 +160,38 @@ class JSONWriter(GenericWriter):
 
     @override
     def append(self, label: str, value: bytes|int, length: Optional[int] = None):
-        if length is not None:
-            assert isinstance(value, bytes), "length can only be specified for value of type bytes"
-            assert len(value) >= length
-            value_fmt = '"{}"'.format(value[:length].hex().upper())
-        else:
-            assert isinstance(value, int)
-            value_fmt = f"{value}"
-        self.fp.write('{}{}"{}": {}'.format(
-            self.comma(), self.ws(), label, value_fmt))
-        self.has_item = True
+        assert self.is_open, "cannot append if not open yet"
+        self.fields.append(encode_field(label, value, length))
 
     def open(self) -> None:
-        assert (self.level > 0 or not self.has_item)
-        self.fp.write("{}{}{{".format(self.comma(), self.ws()))
-        self.level += 1
-        self.has_item = False
+        assert not self.is_open, "cannot open twice"
+        self.is_open = True
 
     def close(self) -> None:
-        assert (self.level > 0 or not self.has_item)
-        self.level -= 1
-        self.fp.write("{}}}".format(self.ws()))
+        assert self.is_open, "cannot close if not open first"
+        self.write_record(self.fields)
+        self.fields = []
+        self.is_open = False
+
+    @override
+    def write_record(self, fields: list[Field]) -> None:
+        indent = "\n" + self.tab * 2
+        items = ",".join([f'{indent}"{label}": "{value}"' if quoted else f'{indent}"{label}": {value}'
+                          for label, value, quoted in fields])
+        self.fp.write(f'{"," * self.has_item}\n{self.tab}{{{items}\n{self.tab}}}')
         self.has_item = True
 
 
 class MultipleWriter(GenericWriter):
     """
     Merge multiple writers to ease invocation.
+    Every value is encoded once and each complete record is handed to all writers.
     """
 
     def __init__(self, filename: str) -> None:
         self.writers: list[GenericWriter] = [JSONWriter(filename), TextWriter(filename)]
+        self.is_open = False
+        self.fields: list[Field] = []
 
     def __enter__(self) -> Self:
         for w in self.writers:
@@ -154,8 +203,8 @@ class MultipleWriter(GenericWriter):
             w.__exit__(stype, value, traceback)
 
     def open(self) -> None:
-        for w in self.writers:
-            w.open()
+        assert not self.is_open, "cannot open twice"
+        self.is_open = True
 
     @overload
     def append(self, label: str, value: bytes, length: Optional[int] = None) -> None: ...
@@ -164,13 +213,43 @@ class MultipleWriter(GenericWriter):
 
     @override
     def append(self, label: str, value: bytes|int, length: Optional[int] = None) -> None:
-        for w in self.writers:
-            if isinstance(value, bytes):
-                w.append(label, value, length)
+        assert self.is_open, "cannot append if not open yet"
+        self.fields.append(encode_field(label, value, length))
 
     def close(self) -> None:
+        assert self.is_open, "cannot close if not open first"
+        self.write_record(self.fields)
+        self.fields = []
+        self.is_open = False
+
+    @override
+    def write_record(self, fields: list[Field]) -> None:
         for w in self.writers:
-            w.close()
+            w.write_record(fields)
+
+
+def merge_shards(filename: str, shards: list[str]) -> None:
+    """
+    Concatenate the Text and JSON outputs of several writers (the shards, in
+    order) into filename.txt and filename.json, exactly as if all records had
+    been written by a single MultipleWriter(filename).
+    """
+    with open(filename + ".txt", "w") as fp:
+        for shard in shards:
+            with open(shard + ".txt") as shard_fp:
+                fp.write(shard_fp.read())
+
+    # each shard is "[" + body + "\n]\n" (or "[]\n" without records),
+    # where body is "\n  {...}" for the first record and ",\n  {...}" for the others
+    bodies = []
+    for shard in shards:
+        with open(shard + ".json") as shard_fp:
+            content = shard_fp.read()
+        if content != "[]\n":
+            assert content.startswith("[") and content.endswith("\n]\n")
+            bodies.append(content[1:-3])
+    with open(filename + ".json", "w") as fp:
+        fp.write("[" + ",".join(bodies) + "\n]\n" if bodies else "[]\n")
 
 
 if __name__ == "__main__":
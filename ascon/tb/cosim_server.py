@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+cosim_server.py  –  Golden model server (ascon.py) cho co-simulation với Verilog TB
+
+Server chạy lâu dài, nhận request qua 1 cặp named pipe (FIFO) hoặc 1 Unix
+socket, trả về CT/TAG, plaintext, output permutation hoặc các state trung gian.
+TB random-stimulus có thể check không giới hạn vector mà không cần sinh .tv trước.
+Không dùng network.
+
+Usage:
+    python cosim_server.py                       # FIFO: cosim/req.fifo, cosim/resp.fifo
+    python cosim_server.py --fifo /tmp/ascon     # FIFO trong thư mục khác
+    python cosim_server.py --socket /tmp/ascon.sock   # Unix socket (cocotb, VPI, ...)
+    python cosim_server.py --once                # thoát sau khi TB đóng kết nối
+
+Protocol: mỗi request là 1 dòng, các field cách nhau bởi space, hex giống file
+.tv (byte đầu tiên viết trước, hoa/thường đều được, "00" nếu độ dài = 0).
+Mỗi request có 1 ID (số nguyên do TB chọn), response bắt đầu bằng ID đó.
+
+    E ID KEY NONCE PT_LEN PT_HEX AD_LEN AD_HEX           encrypt
+      → ID CT_HEX TAG_HEX                                 (CT không gồm tag)
+    D ID KEY NONCE CT_LEN CT_HEX AD_LEN AD_HEX TAG_HEX   decrypt + verify tag
+      → ID OK PT_HEX                                      (OK = 1/0, PT "00" nếu OK = 0)
+    P ID ROUNDS X0 X1 X2 X3 X4                            permutation (state 5 x 64-bit)
+      → ID X0 X1 X2 X3 X4
+    T ID KEY NONCE PT_LEN PT_HEX AD_LEN AD_HEX           state trung gian của encrypt
+      → ID N                                              rồi N dòng:
+        ID PHASE X0 X1 X2 X3 X4                           (PHASE xem PHASE_CODES)
+    Q                                                     dừng server
+    # ...                                                 comment, bỏ qua
+
+Request lỗi cho response "ID ERR" (ID = -1 nếu không đọc được).
+
+Batch + pipeline: TB có thể ghi nhiều request liên tiếp trước khi đọc response.
+Server đọc tất cả request đang có trong pipe, tính chung 1 batch (encrypt /
+permutation chạy trên batch backend của ascon.py) rồi ghi response theo đúng
+thứ tự request.
+
+Phía Verilog (iverilog): mở FIFO request TRƯỚC, response SAU (cùng thứ tự với
+server, nếu không cả 2 bên cùng block), và $fflush sau mỗi nhóm request:
+
+    integer req, rsp, id, r;  reg [127:0] ct, tag;
+    req = $fopen("cosim/req.fifo", "w");
+    rsp = $fopen("cosim/resp.fifo", "r");
+    $fwrite(req, "E %0d %032h %032h 5 %010h 5 %010h\\n", n, key, nonce, pt, ad);
+    $fflush(req);
+    r = $fscanf(rsp, "%d %h %h\\n", id, ct, tag);
+"""
+
+import os
+import sys
+import socket
+import argparse
+
+# Import module ascon (phải cùng thư mục)
+try:
+    import ascon
+except ImportError:
+    print("[ERROR] Không tìm thấy ascon.py – đặt file này cùng thư mục với ascon.py")
+    sys.exit(1)
+
+READ_SIZE = 1 << 16
+
+# Phase của ascon.ascon_encrypt → mã số trong response T (giống thứ tự HW FSM)
+PHASE_CODES = {
+    "initial value"           : 0,
+    "initialization"          : 1,
+    "process associated data" : 2,
+    "process plaintext"       : 3,
+    "finalization"            : 4,
+}
+
+
+def hex_or_zero(b: bytes) -> str:
+    """Trả về hex string, hoặc '00' nếu rỗng (để TB không gặp field trống)."""
+    return b.hex().upper() if b else "00"
+
+def parse_data(length: str, data: str) -> bytes:
+    """Đọc cặp field LEN HEX ("00" khi LEN = 0)."""
+    n = int(length)
+    b = bytes.fromhex(data) if n else b""
+    if len(b) != n:
+        raise ValueError(f"độ dài {n} không khớp với {data}")
+    return b
+
+def parse_block(data: str) -> bytes:
+    b = bytes.fromhex(data)
+    if len(b) != 16:
+        raise ValueError(f"cần 128-bit: {data}")
+    return b
+
+def parse_word(data: str) -> int:
+    """Đọc 1 word state 64-bit (hex)."""
+    x = int(data, 16)
+    if not 0 <= x < 1 << 64:
+        raise ValueError(f"cần 64-bit: {data}")
+    return x
+
+def fmt_state(S) -> str:
+    return " ".join(f"{x:016X}" for x in S)
+
+
+# ============================================================
+#  XỬ LÝ 1 BATCH REQUEST
+# ============================================================
+
+def handle_batch(lines: list[str]) -> tuple[list[str], bool]:
+    """
+    Tính response cho các request trong lines (theo thứ tự).
+    Trả về (response lines, True nếu gặp request Q).
+    Encrypt và permutation của cả batch được gom lại, chạy 1 lần trên
+    ascon_encrypt_many / ascon_permute_many.
+    """
+    responses: list[str] = []
+    encrypts: list[tuple[int, int, tuple]] = []        # (vị trí, ID, job)
+    permutes: dict[int, list[tuple[int, int, list[int]]]] = {}  # rounds → (vị trí, ID, state)
+    quit = False
+
+    for line in lines:
+        tokens = line.split()
+        if not tokens or tokens[0].startswith("#"):
+            continue
+        kind = tokens[0].upper()
+        if kind == "Q":
+            quit = True
+            break
+        try:
+            rid = int(tokens[1])
+        except (IndexError, ValueError):
+            responses.append("-1 ERR\n")
+            continue
+        try:
+            if kind == "E" and len(tokens) == 8:
+                key, nonce = parse_block(tokens[2]), parse_block(tokens[3])
+                pt, ad = parse_data(tokens[4], tokens[5]), parse_data(tokens[6], tokens[7])
+                encrypts.append((len(responses), rid, (key, nonce, ad, pt)))
+                responses.append("")   # điền sau khi chạy batch
+            elif kind == "D" and len(tokens) == 9:
+                key, nonce = parse_block(tokens[2]), parse_block(tokens[3])
+                ct, ad = parse_data(tokens[4], tokens[5]), parse_data(tokens[6], tokens[7])
+                tag = parse_block(tokens[8])
+                pt = ascon.ascon_decrypt(key, nonce, ad, ct + tag)
+                ok = pt is not None
+                responses.append(f"{rid} {int(ok)} {hex_or_zero(pt if ok else b'')}\n")
+            elif kind == "P" and len(tokens) == 8:
+                rounds = int(tokens[2])
+                if not 1 <= rounds <= 12:
+                    raise ValueError(f"rounds = {rounds}")
+                state = [parse_word(x) for x in tokens[3:8]]
+                permutes.setdefault(rounds, []).append((len(responses), rid, state))
+                responses.append("")
+            elif kind == "T" and len(tokens) == 8:
+                key, nonce = parse_block(tokens[2]), parse_block(tokens[3])
+                pt, ad = parse_data(tokens[4], tokens[5]), parse_data(tokens[6], tokens[7])
+                with ascon.AsconTraceBuffer(64) as buffer:
+                    ascon.ascon_encrypt(key, nonce, ad, pt)
+                events = [(PHASE_CODES[phase], S) for phase, _, *S in buffer.events() if phase in PHASE_CODES]
+                responses.append(f"{rid} {len(events)}\n" +
+                                 "".join(f"{rid} {code} {fmt_state(S)}\n" for code, S in events))
+            else:
+                raise ValueError(f"request không hợp lệ: {line.strip()}")
+        except ValueError:
+            responses.append(f"{rid} ERR\n")
+
+    if encrypts:
+        cts = run_many(ascon.ascon_encrypt_many, [job for _, _, job in encrypts])
+        for (pos, rid, _), ct_full in zip(encrypts, cts):
+            responses[pos] = (f"{rid} ERR\n" if ct_full is None else
+                              f"{rid} {hex_or_zero(ct_full[:-16])} {ct_full[-16:].hex().upper()}\n")
+    for rounds, items in permutes.items():
+        states_out = run_many(ascon.ascon_permute_many, [state for _, _, state in items], rounds)
+        for (pos, rid, _), state_out in zip(items, states_out):
+            responses[pos] = f"{rid} ERR\n" if state_out is None else f"{rid} {fmt_state(state_out)}\n"
+
+    return responses, quit
+
+
+def run_many(func, items: list, *args) -> list:
+    """
+    Chạy func(items, *args) (ascon_*_many) cho cả batch. Nếu batch lỗi thì
+    chạy lại từng item, item lỗi cho None (response ERR) để 1 request hỏng
+    không làm dừng server.
+    """
+    try:
+        return func(items, *args)
+    except Exception:
+        results = []
+        for item in items:
+            try:
+                results.append(func([item], *args)[0])
+            except Exception:
+                results.append(None)
+        return results
+
+
+# ============================================================
+#  VÒNG LẶP SERVER
+# ============================================================
+
+def serve(rfd: int, write) -> bool:
+    """
+    Phục vụ 1 kết nối: đọc request từ file descriptor rfd tới EOF, ghi
+    response qua write(str) (write phải tự flush).
+    Trả về True nếu client gửi Q.
+    """
+    pending = b""
+    while True:
+        chunk = os.read(rfd, READ_SIZE)
+        if not chunk:
+            return False
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        if not lines:
+            continue
+        responses, quit = handle_batch([line.decode("ascii", "replace") for line in lines])
+        if responses:
+            write("".join(responses))
+        if quit:
+            return True
+
+
+def serve_fifo(directory: str, once: bool = False):
+    """
+    Server qua 2 named pipe directory/req.fifo (TB → server) và
+    directory/resp.fifo (server → TB). Sau khi TB đóng pipe, chờ simulation kế tiếp.
+    """
+    os.makedirs(directory, exist_ok=True)
+    req_path  = os.path.join(directory, "req.fifo")
+    resp_path = os.path.join(directory, "resp.fifo")
+    for path in (req_path, resp_path):
+        if not os.path.exists(path):
+            os.mkfifo(path)
+    print(f"[OK] Cosim server: request → {req_path}, response ← {resp_path}", flush=True)
+
+    while True:
+        rfd = os.open(req_path, os.O_RDONLY)          # chờ TB mở req.fifo để ghi
+        try:
+            with open(resp_path, "w") as resp:         # chờ TB mở resp.fifo để đọc
+                def write(text: str):
+                    resp.write(text)
+                    resp.flush()
+                try:
+                    quit = serve(rfd, write)
+                except BrokenPipeError:
+                    quit = False                       # TB đóng resp.fifo trước
+        finally:
+            os.close(rfd)
+        if quit or once:
+            return
+
+
+def serve_socket(path: str, once: bool = False):
+    """Server qua Unix socket path, mỗi lần phục vụ 1 client."""
+    if os.path.exists(path):
+        os.unlink(path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        server.listen(1)
+        print(f"[OK] Cosim server: Unix socket {path}", flush=True)
+        try:
+            while True:
+                conn, _ = server.accept()
+                with conn:
+                    try:
+                        quit = serve(conn.fileno(), lambda text: conn.sendall(text.encode("ascii")))
+                    except (BrokenPipeError, ConnectionResetError):
+                        quit = False
+                if quit or once:
+                    return
+        finally:
+            os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ascon golden model server cho co-simulation với Verilog TB")
+    parser.add_argument("--fifo", type=str, default="cosim", metavar="DIR",
+                        help="Thư mục chứa req.fifo / resp.fifo (default: cosim)")
+    parser.add_argument("--socket", type=str, default=None, metavar="PATH",
+                        help="Dùng Unix socket PATH thay cho FIFO")
+    parser.add_argument("--once", action="store_true",
+                        help="Thoát sau khi client đầu tiên đóng kết nối")
+    args = parser.parse_args()
+
+    try:
+        if args.socket:
+            serve_socket(args.socket, args.once)
+        else:
+            serve_fifo(args.fifo, args.once)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
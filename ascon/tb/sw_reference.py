@@ -7,16 +7,21 @@ Usage:
     python sw_reference.py               # in kết quả default
     python sw_reference.py --compare     # in format dễ so sánh với HW log
     python sw_reference.py --no-ad       # tính CT cho trường hợp không có AD (Test 4)
+    python sw_reference.py --sweep       # tamper sweep mọi bit của AD, CT, TAG
+    python sw_reference.py --cache DIR   # lấy lại output từ cache nếu ascon.py không đổi
 """
 
+import io
 import sys
 import argparse
+from contextlib import redirect_stdout
 
 # Import module ascon (phải cùng thư mục)
 try:
     import ascon
+    import vector_cache
 except ImportError:
-    print("[ERROR] Không tìm thấy ascon.py – đặt file này cùng thư mục với ascon.py")
+    print("[ERROR] Không tìm thấy ascon.py / vector_cache.py – đặt file này cùng thư mục với ascon.py")
     sys.exit(1)
 
 # ============================================================
@@ -89,14 +94,134 @@ def run_tamper_test(key, nonce, ad, ct_only, tag):
     # Flip last bit of ciphertext (same as TB: ct ^ 128'h1)
     ct_tampered = bytes(ct_only[:-1]) + bytes([ct_only[-1] ^ 0x01])
     ct_full = ct_tampered + tag
-    result = ascon.ascon_decrypt(key, nonce, ad, ct_full)
 
-    if result is None:
-        print("  [PASS] Tag mismatch correctly detected (result = None)")
+    # tag-only check, no plaintext is computed for the (expected) reject
+    if not ascon.ascon_verify(key, nonce, ad, ct_full):
+        print("  [PASS] Tag mismatch correctly detected (ascon_verify = False)")
     else:
+        result = ascon.ascon_decrypt(key, nonce, ad, ct_full)
         print("  [FAIL] Should have failed but got:", result.hex().upper())
 
 
+# ============================================================
+#  TAMPER SWEEP – lật từng bit của AD, CT, TAG
+# ============================================================
+
+def tamper_sweep(key, nonce, ad, ct_only, tag):
+    """
+    Lật lần lượt từng bit của AD, CT và TAG, kiểm tra decrypt có reject không.
+    Chạy decrypt sạch 1 lần và cache state ngay sau khi absorb mỗi block;
+    mọi bit flip trong 1 block được resume từ state đó (cả block cùng lúc qua
+    ascon.ascon_permute_many), nên không phải chạy lại từ đầu cho từng bit.
+
+    Yield (region, byte_index, passbits) theo thứ tự AD, CT, TAG:
+    bit t của passbits = 1 nếu lật bit t của byte đó bị reject đúng (PASS).
+    Raise ValueError nếu tag của lần chạy sạch khác tag (không có gì để sweep).
+    """
+    rate, a, b = 16, 12, 8
+    k0, k1 = ascon.bytes_to_words(bytes(key))
+    M = ascon.MASK64
+
+    # các bước absorb: S[i] = (S[i] & mask_i) ^ xor_i cho x0, x1 (+ domain separation trước bước)
+    # AD: XOR block đã pad; CT: thay rate bằng CT, block cuối giữ phần sau CT + padding
+    steps = []   # (region, block, nbytes, mask0, mask1, xor0, xor1, domain_sep)
+    if len(ad) > 0:
+        a_padded = bytes(ad) + b"\x01" + bytes(rate - len(ad) % rate - 1)
+        a_words = ascon.bytes_to_words(a_padded)
+        for w in range(0, len(a_words), 2):
+            nbytes = min(rate, len(ad) - 8*w)
+            steps.append(("AD", w//2, nbytes, M, M, a_words[w], a_words[w+1], False))
+    c_lastlen = len(ct_only) % rate
+    c_words = ascon.bytes_to_words(bytes(ct_only) + bytes(rate - c_lastlen))
+    for w in range(0, len(c_words) - 2, 2):
+        steps.append(("CT", w//2, rate, 0, 0, c_words[w], c_words[w+1], w == 0))
+    c_padx = ascon.bytes_to_words(bytes(c_lastlen) + b"\x01" + bytes(rate - c_lastlen - 1))
+    c_mask = ascon.bytes_to_words(bytes(c_lastlen) + b"\xff" * (rate - c_lastlen))
+    w = len(c_words) - 2
+    steps.append(("CT", w//2, c_lastlen, c_mask[0], c_mask[1],
+                  c_words[w] ^ c_padx[0], c_words[w+1] ^ c_padx[1], w == 0))
+
+    def absorb(S, step):
+        _, _, _, mask0, mask1, xor0, xor1, domain_sep = step
+        if domain_sep: S[4] ^= 1 << 63
+        S[0] = (S[0] & mask0) ^ xor0
+        S[1] = (S[1] & mask1) ^ xor1
+
+    def resume(states, j):
+        # chạy tiếp từ sau bước j đến hết, trả về tag tính được cho mỗi state
+        for step in steps[j+1:]:
+            states = ascon.ascon_permute_many(states, b)
+            for S in states: absorb(S, step)
+        for S in states:
+            S[2] ^= k0
+            S[3] ^= k1
+        states = ascon.ascon_permute_many(states, a)
+        return [(S[3] ^ k0, S[4] ^ k1) for S in states]
+
+    # lần chạy sạch: cache state sau khi absorb mỗi block (trước permutation kế tiếp)
+    S = ascon.AsconAEAD(key).initialize(nonce)
+    checkpoints = []
+    for j, step in enumerate(steps):
+        if j > 0: ascon.ascon_permutation(S, b)
+        absorb(S, step)
+        checkpoints.append(list(S))
+    clean_tag = resume([list(checkpoints[-1])], len(steps) - 1)[0]
+    if clean_tag != tuple(ascon.bytes_to_words(bytes(tag))):
+        raise ValueError(f"tag {bytes(tag).hex().upper()} không khớp với decrypt sạch")
+    # kiểm tra end-to-end 1 lần cho cả vector (checkpoint/resume khớp với library)
+    assert ascon.ascon_verify(key, nonce, ad, bytes(ct_only) + bytes(tag))
+
+    # AD / CT: resume tất cả bit flip của 1 block cùng lúc
+    for j, (step, checkpoint) in enumerate(zip(steps, checkpoints)):
+        region, block, nbytes = step[:3]
+        states = []
+        for i in range(nbytes):
+            for t in range(8):
+                S = list(checkpoint)
+                S[i // 8] ^= 1 << (8*(i % 8) + t)
+                states.append(S)
+        tags = resume(states, j)
+        for i in range(nbytes):
+            passbits = 0
+            for t in range(8):
+                if tags[8*i + t] != clean_tag: passbits |= 1 << t
+            yield region, rate*block + i, passbits
+
+    # TAG: tag tính được không đổi (clean_tag), so trực tiếp với tag đã lật bit
+    for i in range(len(tag)):
+        passbits = 0
+        for t in range(8):
+            flipped = bytearray(tag)
+            flipped[i] ^= 1 << t
+            if tuple(ascon.bytes_to_words(bytes(flipped))) != clean_tag: passbits |= 1 << t
+        yield "TAG", i, passbits
+
+
+def tamper_bitmap(key, nonce, ad, ct_only, tag):
+    """Gom kết quả tamper_sweep thành {region: bitmap bytes} (1 bit = 1 bit flip, 1 = PASS)."""
+    bitmaps = {"AD": bytearray(len(ad)), "CT": bytearray(len(ct_only)), "TAG": bytearray(len(tag))}
+    for region, index, passbits in tamper_sweep(key, nonce, ad, ct_only, tag):
+        bitmaps[region][index] = passbits
+    return {region: bytes(bitmap) for region, bitmap in bitmaps.items()}
+
+
+def run_tamper_sweep(key, nonce, ad, ct_only, tag):
+    print(f"\n{'='*54}")
+    print(f"  TAMPER SWEEP (mọi bit của AD, CT, TAG – expect FAIL)")
+    print(f"{'='*54}")
+
+    try:
+        bitmaps = tamper_bitmap(key, nonce, ad, ct_only, tag)
+    except ValueError as e:
+        print(f"  [FAIL] {e}")
+        return
+    for region, bitmap in bitmaps.items():
+        nbits = 8 * len(bitmap)
+        npass = sum(bin(byte).count("1") for byte in bitmap)
+        status = "PASS" if npass == nbits else "FAIL"
+        print(f"  {region:<4}: {npass}/{nbits} flips rejected  [{status}]  bitmap={bitmap.hex().upper() or '-'}")
+
+
 def print_verilog_params():
     """In ra các localparam để copy vào Verilog TB."""
     print(f"\n{'='*54}")
@@ -116,16 +241,8 @@ def print_verilog_params():
     print(f'  localparam [127:0] REF_TAG    = 128\'h{bytes_to_hex128(tag)};')
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Ascon SW reference – matched to Verilog TB inputs")
-    parser.add_argument("--compare", action="store_true",
-                        help="In format dễ so sánh với HW simulation log")
-    parser.add_argument("--no-ad", action="store_true",
-                        help="Thêm test không có AD (ad_valid=0, Test 4)")
-    parser.add_argument("--params", action="store_true",
-                        help="In Verilog localparam để copy vào TB")
-    args = parser.parse_args()
-
+def report(args: argparse.Namespace):
+    """In toàn bộ kết quả SW reference theo các option trong args."""
     print("\n" + "="*54)
     print("  Ascon-128 SW Reference  (run_auto.py SW defaults)")
     print("="*54)
@@ -138,6 +255,8 @@ def main():
 
     # Test 3: Tamper
     run_tamper_test(KEY, NONCE, AD, ct_only, tag)
+    if args.sweep:
+        run_tamper_sweep(KEY, NONCE, AD, ct_only, tag)
 
     # Test 4: No AD
     if args.no_ad:
@@ -167,5 +286,40 @@ def main():
     print()
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Ascon SW reference – matched to Verilog TB inputs")
+    parser.add_argument("--compare", action="store_true",
+                        help="In format dễ so sánh với HW simulation log")
+    parser.add_argument("--no-ad", action="store_true",
+                        help="Thêm test không có AD (ad_valid=0, Test 4)")
+    parser.add_argument("--params", action="store_true",
+                        help="In Verilog localparam để copy vào TB")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Tamper sweep: lật từng bit của AD, CT, TAG (coverage tag comparator)")
+    parser.add_argument("--cache", type=str, default=None, metavar="DIR",
+                        help="Thư mục cache output (default: $ASCON_VECTOR_CACHE, không đặt = tắt cache)")
+    parser.add_argument("--cache-size", type=int, default=None, metavar="MB",
+                        help="Giới hạn dung lượng cache (default: $ASCON_VECTOR_CACHE_SIZE hoặc 1024)")
+    args = parser.parse_args()
+
+    cache = vector_cache.VectorCache.from_env(args.cache, args.cache_size)
+    if cache is None:
+        report(args)
+        return
+
+    # Output chỉ phụ thuộc các option và source của ascon.py / file này
+    def generate() -> dict:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            report(args)
+        return {"stdout": out.getvalue()}
+
+    key = vector_cache.cache_key({"compare": args.compare, "no_ad": args.no_ad,
+                                  "params": args.params, "sweep": args.sweep},
+                                 ascon.__file__, __file__)
+    summary, _ = vector_cache.cached(cache, key, {}, generate)
+    sys.stdout.write(summary["stdout"])
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
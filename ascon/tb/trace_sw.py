@@ -49,6 +49,7 @@ def trace_encrypt():
     taglen  = 128
 
     S = [0]*5
+    phases = {}   # phase của ascon.ascon_encrypt → state tính tay ở đây (để so với trace)
 
     # ---- INITIALIZATION ----
     print("── INITIALIZATION ──────────────────────────────────")
@@ -61,6 +62,7 @@ def trace_encrypt():
     state_bytes = iv_bytes + KEY + NONCE
     S = [bytes_to_int_le(state_bytes[8*i:8*(i+1)]) for i in range(5)]
     print(f"  after load  : {fmt(S)}")
+    phases["initial value"] = S[:]
     # Map to HW-style: x0 = S[0]..x4 = S[4]
     print(f"  [HW expects] state_load src=00  next[319:256]={S[0]:016x}")
     print()
@@ -80,6 +82,7 @@ def trace_encrypt():
     for i in range(5):
         S[i] ^= zero_key[i]
     print(f"  after key XOR (post-init): {fmt(S)}")
+    phases["initialization"] = S[:]
     print(f"  [HW expects] state_load post_init=1  next[319:256]={S[0]:016x}")
     print()
 
@@ -108,6 +111,7 @@ def trace_encrypt():
     # Domain separation
     S[4] ^= (1 << 63)
     print(f"\n  domain sep  : x4 MSB flipped → x4={S[4]:016x}")
+    phases["process associated data"] = S[:]
     print(f"  [HW expects] state_load dom_sep=1  next[319:256]={S[0]:016x}")
     print()
 
@@ -126,6 +130,7 @@ def trace_encrypt():
     print(f"  state x0 before XOR: {S[0]:016x}")
     S[0] ^= w0
     S[1] ^= w1
+    phases["process plaintext"] = S[:]
     ct_w0 = S[0]
     ct_w1 = S[1]
     ct_bytes = int_to_bytes_le(ct_w0, 8)[:p_lastlen] + int_to_bytes_le(ct_w1, 8)[:max(0,p_lastlen-8)]
@@ -157,6 +162,7 @@ def trace_encrypt():
     # Tag
     S[3] ^= bytes_to_int_le(KEY[-16:-8])
     S[4] ^= bytes_to_int_le(KEY[-8:])
+    phases["finalization"] = S[:]
     tag = int_to_bytes_le(S[3], 8) + int_to_bytes_le(S[4], 8)
     print(f"  tag         : {tag.hex()}")
     print()
@@ -178,9 +184,17 @@ def trace_encrypt():
 
     # Also cross-check with ascon library
     print("── Cross-check with ascon library ───────────────────")
-    ct_lib = ascon.ascon_encrypt(KEY, NONCE, AD, PT)
+    with ascon.AsconTraceBuffer(64) as trace:
+        ct_lib = ascon.ascon_encrypt(KEY, NONCE, AD, PT)
     print(f"  library CT  : {ct_lib[:-16].hex()}")
     print(f"  library TAG : {ct_lib[-16:].hex()}")
+    # State sau mỗi phase (trace event của library) so với state tính tay ở trên
+    lib_phases = {phase: S for phase, _, *S in trace.events()}
+    for phase, S in phases.items():
+        ok = lib_phases.get(phase) == S
+        print(f"  {phase:<24}: {'✓ MATCH' if ok else '✗ MISMATCH'}")
+        if not ok:
+            print(f"    library : {fmt(lib_phases[phase]) if phase in lib_phases else '(không có event)'}")
 
 
 # ============================================================
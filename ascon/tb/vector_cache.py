@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for generated test vectors and reference outputs.
+
+An entry is addressed by a digest of the generator arguments and of the source
+files that produce the output (ascon.py and the generator script), so any
+change to the inputs or to the reference model is a cache miss. An entry holds
+named output files plus a JSON summary. On a hit the files are hardlinked (or
+copied across filesystems) to their destinations instead of regenerated.
+Entries are evicted least-recently-used first once the cache exceeds its size
+bound.
+
+Cached files are read-only, and lookup() removes the destination files on a
+miss, so a generator never writes through a hardlink into the cache.
+
+Used by SW_check/verify_hw.py and tb/sw_reference.py; tb/vector_cache.py is a
+verbatim copy of this file.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+CACHE_ENV = "ASCON_VECTOR_CACHE"            # cache directory (unset = no cache)
+CACHE_SIZE_ENV = "ASCON_VECTOR_CACHE_SIZE"  # size bound in MiB
+DEFAULT_SIZE_MB = 1024
+SUMMARY = "summary.json"  # per-entry summary; its mtime is the last use
+
+
+# === public interface ===
+
+def cache_key(args: Mapping[str, Any], *sources: str) -> str:
+    """
+    Digest of the generator arguments and the contents of the given source files.
+    args: JSON-serializable generator arguments (output paths excluded)
+    sources: paths of the files whose code determines the output
+    """
+    h = hashlib.sha256(json.dumps(args, sort_keys=True).encode())
+    for source in sources:
+        h.update(source_digest(os.path.abspath(source)).encode())
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def source_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class VectorCache:
+    """
+    Cache directory with entries root/<key[:2]>/<key>/{<name>..., summary.json}.
+    root: cache directory, created on demand
+    max_bytes: size bound enforced after every store()
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_SIZE_MB << 20) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls, root: str|None = None, size_mb: int|None = None) -> VectorCache|None:
+        """
+        The cache at root (default: $ASCON_VECTOR_CACHE), or None if no directory is configured.
+        """
+        root = root or os.environ.get(CACHE_ENV)
+        if not root: return None
+        if size_mb is None: size_mb = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_SIZE_MB))
+        return cls(root, size_mb << 20)
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def lookup(self, key: str, files: Mapping[str, str]) -> Any|None:
+        """
+        On a hit, place the cached files at files[name] and return the stored summary.
+        On a miss, remove the destination files and return None.
+        """
+        entry = self.entry_path(key)
+        try:
+            with open(os.path.join(entry, SUMMARY)) as f:
+                summary = json.load(f)["summary"]
+            for name, dest in files.items():
+                place(os.path.join(entry, name), dest)
+        except (OSError, ValueError, KeyError):
+            for dest in files.values():
+                remove(dest)
+            return None
+        os.utime(os.path.join(entry, SUMMARY))  # mark as recently used
+        return summary
+
+    def store(self, key: str, files: Mapping[str, str], summary: Any = None) -> None:
+        """
+        Store the generated files (name -> path) and a JSON-serializable summary under key.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix="tmp-", dir=self.root)
+        try:
+            for name, src in files.items():
+                dst = os.path.join(tmp, name)
+                shutil.copyfile(src, dst)
+                os.chmod(dst, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            with open(os.path.join(tmp, SUMMARY), "w") as f:
+                json.dump({"summary": summary, "files": sorted(files)}, f)
+            entry = self.entry_path(key)
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            try:
+                os.rename(tmp, entry)  # atomic publish
+            except OSError:
+                pass  # stored concurrently by another process
+        finally:
+            if os.path.isdir(tmp): shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least-recently-used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+        for entry in self.entries():
+            size = sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+            try:
+                last_use = os.stat(os.path.join(entry, SUMMARY)).st_mtime
+            except OSError:
+                last_use = 0.0  # incomplete entry: evict first
+            entries.append((last_use, size, entry))
+            total += size
+        for last_use, size, entry in sorted(entries):
+            if total <= self.max_bytes: break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def entries(self) -> list[str]:
+        if not os.path.isdir(self.root): return []
+        return [entry.path for shard in os.scandir(self.root) if shard.is_dir() and len(shard.name) == 2
+                for entry in os.scandir(shard.path) if entry.is_dir()]
+
+
+def cached(cache: VectorCache|None, key: str, files: Mapping[str, str], generate: Callable[[], Any]) -> tuple[Any, bool]:
+    """
+    Run generate() to write files (name -> path) unless the cache has them under key.
+    generate: writes the files and returns a JSON-serializable summary (not None)
+    returns (summary, hit)
+    """
+    if cache is None:
+        for dest in files.values():
+            remove(dest)  # may be a read-only link from an earlier cache hit
+        return generate(), False
+    summary = cache.lookup(key, files)
+    if summary is not None: return summary, True
+    summary = generate()
+    assert summary is not None
+    cache.store(key, files, summary)
+    return summary, False
+
+
+# === helpers ===
+
+def place(src: str, dest: str) -> None:
+    # hardlink src to dest, copy if linking is not possible (other filesystem)
+    remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass